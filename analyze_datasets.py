@@ -1,25 +1,34 @@
 # analyze_datasets.py
+import argparse
 import pandas as pd
 import os
+from concurrent.futures import ProcessPoolExecutor
 
+from dataset_io import dataset_columns, iter_dataset_chunks, read_dataset
 
-def analyze_all_datasets():
+
+DATASET_FILES = [
+    'data/fake_news_data.csv',
+    'large_fake_news_dataset.csv',
+    'kaggle_fake_news_16.csv',
+    'real_training_data.csv'
+]
+
+# Text length histogram: 10-character bins up to 1000, then one overflow bin
+LENGTH_BIN_WIDTH = 10
+LENGTH_BINS = 100
+
+
+def analyze_all_datasets(dataset_files=DATASET_FILES):
     """Analyze all dataset files to count real vs fake samples"""
     print("📊 ANALYZING DATASET DISTRIBUTIONS")
     print("=" * 50)
 
-    dataset_files = [
-        'data/fake_news_data.csv',
-        'large_fake_news_dataset.csv',
-        'kaggle_fake_news_16.csv',
-        'real_training_data.csv'
-    ]
-
     for file_path in dataset_files:
         if os.path.exists(file_path):
             try:
-                df = pd.read_csv(file_path)
-                if 'label' in df.columns:
+                if 'label' in dataset_columns(file_path):
+                    df = read_dataset(file_path, columns=['label'])
                     fake_count = df[df['label'] == 1].shape[0]
                     real_count = df[df['label'] == 0].shape[0]
                     total = len(df)
@@ -37,5 +46,145 @@ def analyze_all_datasets():
             print(f"\n📭 {file_path}: File not found")
 
 
+class HyperLogLog:
+    """Fixed-size distinct-count sketch over 64-bit hashes (~0.8% error at p=14)"""
+
+    def __init__(self, p=14):
+        import numpy as np
+
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        import numpy as np
+
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not len(hashes):
+            return
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        # frexp's exponent is the bit length; exact since rest has < 53 bits
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        rank = (64 - self.p - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def count(self):
+        import numpy as np
+
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * np.log(self.m / zeros)
+        return int(round(estimate))
+
+
+def scan_dataset(file_path, chunksize=100000):
+    """Single streaming pass over one dataset; memory is bounded by chunksize"""
+    import numpy as np
+
+    header = dataset_columns(file_path)
+    if 'label' not in header:
+        return {"file": file_path, "error": "No 'label' column found"}
+    columns = ['label', 'text'] if 'text' in header else ['label']
+
+    stats = {"file": file_path, "total": 0, "fake": 0, "real": 0}
+    lengths = np.zeros(LENGTH_BINS + 1, dtype=np.int64)
+    length_sum, length_min, length_max = 0, None, 0
+    rows_sketch, vocab_sketch = HyperLogLog(), HyperLogLog()
+
+    for chunk in iter_dataset_chunks(file_path, columns=columns, chunksize=chunksize):
+        labels = chunk['label']
+        stats["total"] += len(chunk)
+        stats["fake"] += int((labels == 1).sum())
+        stats["real"] += int((labels == 0).sum())
+
+        if 'text' in chunk and len(chunk):
+            text = chunk['text'].fillna('').astype(str)
+            text_lengths = text.str.len().to_numpy()
+            lengths += np.bincount(np.minimum(text_lengths // LENGTH_BIN_WIDTH, LENGTH_BINS),
+                                   minlength=LENGTH_BINS + 1)
+            length_sum += int(text_lengths.sum())
+            length_max = max(length_max, int(text_lengths.max()))
+            chunk_min = int(text_lengths.min())
+            length_min = chunk_min if length_min is None else min(length_min, chunk_min)
+
+            rows_sketch.add_hashes(pd.util.hash_pandas_object(text, index=False).to_numpy())
+            tokens = text.str.lower().str.findall(r"\w\w+").explode().dropna()
+            vocab_sketch.add_hashes(pd.util.hash_pandas_object(tokens, index=False).to_numpy())
+
+    if 'text' in columns and stats["total"]:
+        cumulative = np.cumsum(lengths)
+
+        def length_quantile(q):
+            bin_index = int(np.searchsorted(cumulative, q * stats["total"]))
+            return min((bin_index + 1) * LENGTH_BIN_WIDTH, length_max)
+
+        distinct = min(rows_sketch.count(), stats["total"])
+        stats["text_length"] = {
+            "min": length_min,
+            "max": length_max,
+            "mean": length_sum / stats["total"],
+            "p50": length_quantile(0.5),
+            "p90": length_quantile(0.9),
+            "p99": length_quantile(0.99)
+        }
+        stats["distinct_texts_estimate"] = distinct
+        stats["duplicate_rate_estimate"] = 1 - distinct / stats["total"]
+        stats["vocabulary_size_estimate"] = vocab_sketch.count()
+    return stats
+
+
+def analyze_all_datasets_streaming(dataset_files=DATASET_FILES, chunksize=100000, workers=None):
+    """Like analyze_all_datasets, but scans files in parallel processes and in chunks"""
+    print("📊 ANALYZING DATASET DISTRIBUTIONS (streaming)")
+    print("=" * 50)
+
+    existing = [f for f in dataset_files if os.path.exists(f)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {f: pool.submit(scan_dataset, f, chunksize) for f in existing}
+
+        for file_path in dataset_files:
+            if file_path not in futures:
+                print(f"\n📭 {file_path}: File not found")
+                continue
+            try:
+                stats = futures[file_path].result()
+            except Exception as e:
+                print(f"\n❌ {file_path}: Error reading file - {e}")
+                continue
+            if "error" in stats:
+                print(f"\n❌ {file_path}: {stats['error']}")
+                continue
+
+            total, fake_count, real_count = stats["total"], stats["fake"], stats["real"]
+            print(f"\n📁 {file_path}:")
+            print(f"   📈 Total samples: {total}")
+            if total:
+                print(f"   🎭 Fake news: {fake_count} ({fake_count / total * 100:.1f}%)")
+                print(f"   ✅ Real news: {real_count} ({real_count / total * 100:.1f}%)")
+            ratio = f"{real_count / fake_count:.2f}" if fake_count > 0 else "N/A"
+            print(f"   ⚖️  Balance ratio: {ratio}")
+            if "text_length" in stats:
+                lengths = stats["text_length"]
+                print(f"   📏 Text length: min {lengths['min']}, mean {lengths['mean']:.1f}, "
+                      f"p50 ≤{lengths['p50']}, p90 ≤{lengths['p90']}, p99 ≤{lengths['p99']}, max {lengths['max']}")
+                print(f"   🔁 Duplicate rate: ~{stats['duplicate_rate_estimate'] * 100:.1f}% "
+                      f"(~{stats['distinct_texts_estimate']} distinct texts)")
+                print(f"   🔤 Vocabulary size: ~{stats['vocabulary_size_estimate']}")
+
+
 if __name__ == "__main__":
-    analyze_all_datasets()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Count real vs fake samples in the dataset files")
+    parser.add_argument('files', nargs='*', default=DATASET_FILES)
+    parser.add_argument('--streaming', action='store_true',
+                        help="scan in chunks across processes and report extra statistics")
+    parser.add_argument('--chunksize', type=int, default=100000)
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+
+    if args.streaming:
+        analyze_all_datasets_streaming(args.files, args.chunksize, args.workers)
+    else:
+        analyze_all_datasets(args.files)
\ No newline at end of file
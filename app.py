@@ -1,14 +1,402 @@
-from flask import Flask, request, jsonify
+import time
+
+_import_started = time.perf_counter()
+
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
-import pandas as pd
-from model import FakeNewsDetector
+from dataset_io import preferred_path
+from detectors import DETECTOR_CLASSES, MMAP_MODES, load_registered, predict_many
+from feedback_log import FeedbackLog
+from metrics import SIZE_BUCKETS, registry as metrics
+from micro_batcher import MicroBatcher
+from model_search import DEFAULT_C_VALUES, DEFAULT_NGRAM_RANGES, search_and_save
+from model_registry import ModelRegistry, RegistryError
+from prediction_cache import PredictionCache
+from prediction_store import PredictionStore, model_fingerprint, text_hash
+from training_jobs import TrainingJobs, train_in_worker, train_streaming_in_worker
+import json
 import os
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-# Initialize detector
-detector = FakeNewsDetector()
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        labels = (('endpoint', endpoint), ('method', request.method), ('status', str(response.status_code)))
+
+        def record():
+            metrics.observe('request_latency_seconds', time.perf_counter() - started, (('endpoint', endpoint),))
+            metrics.inc('requests_total', labels)
+
+        if response.is_streamed:
+            # A streamed body is produced after this hook returns
+            response.call_on_close(record)
+        else:
+            record()
+    return response
+
+class NoModel:
+    """Serves until a model is loaded or trained; model.py is only imported
+    once a full model is actually needed"""
+
+    is_trained = False
+
+    def predict(self, text):
+        raise RuntimeError("No model loaded. Train or load a model first.")
+
+
+detector = NoModel()
+
+# Bumped whenever the serving model changes; part of every cache key
+model_version = 0
+
+# (detector, model_version) published together so a request never pairs one
+# model's predictions with another model's cache version
+serving = (detector, model_version)
+
+# Largest number of texts scored in a single model call by /batch_predict
+BATCH_CHUNK_SIZE = 1000
+
+# Repeated headlines are served from here instead of re-running the model
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 10000))
+PREDICTION_CACHE_TTL = float(os.environ['PREDICTION_CACHE_TTL']) if os.environ.get('PREDICTION_CACHE_TTL') else None
+prediction_cache = PredictionCache(max_size=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL)
+
+
+_swap_lock = threading.Lock()
+
+
+def install_detector(new_detector):
+    """Atomically replace the serving detector and invalidate cached predictions.
+
+    Handlers read `serving` once per request, so each request sees either
+    the old model or the new one, never a half-trained instance.
+    """
+    global detector, model_version, serving
+    with _swap_lock:
+        detector = new_detector
+        model_version += 1
+        serving = (detector, model_version)
+        prediction_cache.clear()
+
+
+# Modes accepted by /train; "compact" and "quantized" are exported from a full
+# model instead.
+# "search" cross-validates a parameter grid and saves the best full model.
+TRAINING_MODES = ("full", "streaming", "search")
+
+
+def load_model(mode='full', **load_options):
+    global serving_version
+    new_detector = DETECTOR_CLASSES[mode]()
+    new_detector.load_model(**load_options)
+    with _registry_lock:
+        install_detector(new_detector)
+        serving_version = None
+
+
+# Every trained model is registered as a version; the serving model can be
+# switched between versions (or rolled back) without a restart
+MODEL_REGISTRY_DIR = os.environ.get('MODEL_REGISTRY_DIR', 'models')
+model_registry = ModelRegistry(MODEL_REGISTRY_DIR)
+# Registry version the serving detector was loaded from, if any
+serving_version = None
+_registry_lock = threading.Lock()
+
+
+def serve_version(version):
+    """Serve a registered version without changing which one is active"""
+    global serving_version
+    with _registry_lock:
+        meta = model_registry.get(version)
+        if meta is None:
+            raise RegistryError(f"Unknown model version: {version}")
+        new_detector = load_registered(model_registry, version)
+        install_detector(new_detector)
+        serving_version = version
+    # Crash recovery: the version may already hold feedback the log has not marked applied yet
+    feedback_offset = meta["metadata"].get("feedback_offset")
+    if feedback_offset is not None and feedback_offset > feedback_log.applied_offset():
+        feedback_log.mark_applied(feedback_offset)
+
+
+def activate_version(version):
+    """Load a registered version, then make it both the active and the serving model.
+
+    The detector is loaded and hash-checked before anything changes, so a
+    broken version leaves the current model serving.
+    """
+    global serving_version
+    with _registry_lock:
+        new_detector = model_registry.load(version)
+        previous = model_registry.activate(version)
+        install_detector(new_detector)
+        serving_version = version
+        return previous
+
+
+def rollback_version():
+    """Serve the version that was active before the current one"""
+    global serving_version
+    with _registry_lock:
+        version = model_registry.previous()
+        if version is None:
+            raise RegistryError("No earlier version to roll back to")
+        new_detector = model_registry.load(version)
+        model_registry.rollback()
+        install_detector(new_detector)
+        serving_version = version
+        return version
+
+
+def _registry_mtime():
+    try:
+        return os.stat(model_registry.state_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+# registry.json as of the last check. Other processes (serve.py workers, the
+# registry CLI) change the active version by replacing that file.
+_registry_seen_mtime = _registry_mtime()
+
+
+def follow_registry():
+    """Serve the active version if registry.json changed since the last check"""
+    global _registry_seen_mtime
+    mtime = _registry_mtime()
+    if mtime == _registry_seen_mtime:
+        return
+    _registry_seen_mtime = mtime
+    version = model_registry.active()
+    if version is not None and version != serving_version:
+        serve_version(version)
+
+
+@app.before_request
+def follow_registry_changes():
+    # One stat() per request; a broken version keeps the current model serving
+    try:
+        follow_registry()
+    except Exception as e:
+        print(f"[{os.getpid()}] Could not load the active model version: {e}")
+
+
+training_jobs = TrainingJobs(on_complete=lambda result: activate_version(result["version"]),
+                             path=os.path.join(MODEL_REGISTRY_DIR, 'jobs.sqlite'))
+
+
+# Labelled feedback is logged durably and folded into incremental models in batches
+FEEDBACK_BATCH_SIZE = int(os.environ.get('FEEDBACK_BATCH_SIZE', 200))
+feedback_log = FeedbackLog()
+feedback_stats = {"received": 0, "applied": 0, "updates": 0, "last_update_seconds": None, "last_error": None}
+_feedback_updates = ThreadPoolExecutor(max_workers=1)
+_feedback_lock = threading.Lock()
+_feedback_unscheduled = 0
+
+
+def apply_feedback():
+    """Fold all pending feedback into the serving model, FEEDBACK_BATCH_SIZE records at a time.
+
+    Runs on the update executor, so a failure is recorded in
+    feedback_stats["last_error"]; the records stay pending and are retried
+    by the next scheduled update.
+    """
+    try:
+        _apply_pending_feedback()
+    except Exception as e:
+        with _feedback_lock:
+            feedback_stats["last_error"] = f"{type(e).__name__}: {e}"
+
+
+def detector_mode(current):
+    """The DETECTOR_CLASSES mode a detector instance belongs to"""
+    for mode, detector_class in DETECTOR_CLASSES.items():
+        if isinstance(detector_class, type) and type(current) is detector_class:
+            return mode
+    return "full"
+
+
+def _apply_pending_feedback():
+    global serving_version
+    while True:
+        current = detector
+        if not hasattr(current, 'updated_with'):
+            return
+        records, offset = feedback_log.read_pending(limit=FEEDBACK_BATCH_SIZE)
+        if not records:
+            return
+
+        started = time.perf_counter()
+        updated = current.updated_with([r["text"] for r in records], [r["label"] for r in records])
+        with _registry_lock:
+            # A retrain or activation that finished meanwhile wins; the batch is retried on top of it
+            if detector is not current:
+                continue
+            # Registered and activated before the offset is marked applied, so
+            # a restart serves this version; serve_version() catches the log
+            # up if we stop in between
+            meta = model_registry.register(updated, detector_mode(updated), metadata={
+                "feedback_offset": offset,
+                "feedback_records": len(records),
+                "base_version": serving_version
+            })
+            model_registry.activate(meta["version"])
+            install_detector(updated)
+            serving_version = meta["version"]
+        updated.save_model()
+        feedback_log.mark_applied(offset)
+
+        with _feedback_lock:
+            feedback_stats["applied"] += len(records)
+            feedback_stats["updates"] += 1
+            feedback_stats["last_update_seconds"] = time.perf_counter() - started
+            feedback_stats["last_error"] = None
+
+
+def score_chunk(current, texts):
+    with metrics.timer('model_stage_seconds', (('stage', 'total'),)):
+        return predict_many(current, texts)
+
+
+# Optional coalescing of concurrent /predict calls into batched model calls
+MICRO_BATCH_ENABLED = os.environ.get('MICRO_BATCH_ENABLED', '0') == '1'
+MICRO_BATCH_MAX_WAIT_MS = float(os.environ.get('MICRO_BATCH_MAX_WAIT_MS', 5))
+MICRO_BATCH_MAX_SIZE = int(os.environ.get('MICRO_BATCH_MAX_SIZE', 64))
+MICRO_BATCH_TIMEOUT = float(os.environ.get('MICRO_BATCH_TIMEOUT', 30))
+
+
+def score_micro_batch(texts):
+    metrics.observe('batch_size', len(texts), (('endpoint', '/predict'),), buckets=SIZE_BUCKETS)
+    return score_chunk(detector, texts)
+
+
+micro_batcher = MicroBatcher(
+    score_micro_batch,
+    max_wait_ms=MICRO_BATCH_MAX_WAIT_MS,
+    max_batch=MICRO_BATCH_MAX_SIZE,
+    timeout=MICRO_BATCH_TIMEOUT
+) if MICRO_BATCH_ENABLED else None
+
+
+def predict_text(text):
+    current, version = serving
+    result = prediction_cache.get(text, version)
+    if result is None:
+        if micro_batcher is not None:
+            result = micro_batcher.predict(text)
+        else:
+            result = current.predict(text)
+        prediction_cache.put(text, version, result)
+    return result
+
+
+# Optional on-disk store consulted by /batch_predict before the model, so
+# nightly re-scoring of the same articles under the same model is a lookup
+PREDICTION_STORE_PATH = os.environ.get('PREDICTION_STORE_PATH')
+prediction_store = PredictionStore(PREDICTION_STORE_PATH) if PREDICTION_STORE_PATH else None
+_store_model_id = (None, None)
+
+
+def store_model_id(current):
+    """Persistent identity of the serving model, computed once per detector"""
+    global _store_model_id
+    owner, model_id = _store_model_id
+    if owner is not current:
+        model_id = model_fingerprint(current)
+        _store_model_id = (current, model_id)
+    return model_id
+
+
+def score_chunk_with_store(current, model_id, texts):
+    hashes = [text_hash(text) for text in texts]
+    stored = prediction_store.get_many(model_id, hashes)
+    todo = [j for j, digest in enumerate(hashes) if digest not in stored]
+    scored = score_chunk(current, [texts[j] for j in todo]) if todo else []
+    prediction_store.put_many(model_id, [(hashes[j], result) for j, result in zip(todo, scored)])
+
+    results = [stored.get(digest) for digest in hashes]
+    for j, result in zip(todo, scored):
+        results[j] = result
+    return results
+
+
+# Upper bound on a gzip-compressed request body once inflated
+MAX_DECOMPRESSED_BYTES = int(os.environ.get('MAX_DECOMPRESSED_BYTES', 512 * 1024 * 1024))
+
+
+class RequestBodyError(ValueError):
+    pass
+
+
+def read_json_body():
+    """Parse the JSON request body, inflating it first if sent with Content-Encoding: gzip"""
+    raw = request.get_data(cache=False)
+    if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            raw = inflater.decompress(raw, MAX_DECOMPRESSED_BYTES)
+        except zlib.error as e:
+            raise RequestBodyError(f"Invalid gzip body: {e}")
+        if inflater.unconsumed_tail:
+            raise RequestBodyError("Decompressed request body is too large")
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        raise RequestBodyError(f"Invalid JSON body: {e}")
+
+
+def query_flag(name, default):
+    value = request.args.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def predict_texts(texts, chunk_size=BATCH_CHUNK_SIZE):
+    """Score texts in chunks, one vectorize + predict_proba call per chunk.
+
+    Cached texts are skipped, then texts in the prediction store (if
+    enabled). Falls back to per-item predict() for detectors without
+    predict_batch().
+    """
+    current, version = serving
+    results = [prediction_cache.get(text, version) for text in texts]
+
+    # Repeats within the batch are scored once
+    missing = {}
+    for i, result in enumerate(results):
+        if result is None:
+            missing.setdefault(PredictionCache.make_key(texts[i], version), []).append(i)
+    groups = list(missing.values())
+    model_id = store_model_id(current) if prediction_store is not None and groups else None
+
+    for start in range(0, len(groups), chunk_size):
+        chunk_groups = groups[start:start + chunk_size]
+        chunk = [texts[indices[0]] for indices in chunk_groups]
+        if model_id is not None:
+            scored = score_chunk_with_store(current, model_id, chunk)
+        else:
+            scored = score_chunk(current, chunk)
+        for indices, text, result in zip(chunk_groups, chunk, scored):
+            for i in indices:
+                results[i] = result
+            prediction_cache.put(text, version, result)
+    return results
 
 
 @app.route('/')
@@ -17,9 +405,15 @@ def home():
         "message": "Fake News Detection API",
         "status": "running",
         "endpoints": {
-            "/train": "POST - Train the model",
+            "/train": "POST - Start a background training job",
+            "/train/<job_id>": "GET - Training job status",
             "/predict": "POST - Predict if news is fake",
-            "/stats": "GET - Get model statistics"
+            "/stats": "GET - Get model statistics",
+            "/metrics": "GET - Prometheus metrics",
+            "/feedback": "POST - Submit labelled texts, GET - Feedback status",
+            "/models": "GET - List registered model versions",
+            "/models/<version>/activate": "POST - Serve a registered version",
+            "/models/rollback": "POST - Serve the previously active version"
         }
     })
 
@@ -27,24 +421,49 @@ def home():
 @app.route('/train', methods=['POST'])
 def train_model():
     try:
+        data = request.get_json(silent=True) or {}
         data_path = 'data/fake_news_data.csv'
+        mode = data.get('mode', 'full')
+
+        if mode not in TRAINING_MODES:
+            return jsonify({"error": f"Unknown training mode: {mode}"}), 400
 
         if not os.path.exists(data_path):
             return jsonify({"error": "Training data not found"}), 400
 
-        accuracy = detector.train(data_path)
-        detector.save_model()
+        if mode == 'streaming':
+            # Streaming training reads a Parquet/Arrow copy of the data when one exists
+            chunksize = int(data.get('chunksize', 50000))
+            job = training_jobs.submit(train_streaming_in_worker, preferred_path(data_path), chunksize,
+                                       registry_root=MODEL_REGISTRY_DIR)
+        elif mode == 'search':
+            c_values = [float(c) for c in data.get('C', DEFAULT_C_VALUES)]
+            ngram_ranges = [tuple(int(n) for n in r) for r in data.get('ngram_ranges', DEFAULT_NGRAM_RANGES)]
+            job = training_jobs.submit(search_and_save, preferred_path(data_path), c_values, ngram_ranges,
+                                       int(data.get('folds', 5)), registry_root=MODEL_REGISTRY_DIR)
+        else:
+            job = training_jobs.submit(train_in_worker, data_path, registry_root=MODEL_REGISTRY_DIR)
 
         return jsonify({
-            "message": "Model trained successfully",
-            "accuracy": accuracy,
-            "status": "ready"
-        })
+            "message": "Training started",
+            "job_id": job["job_id"],
+            "mode": mode,
+            "status": job["status"],
+            "status_url": f"/train/{job['job_id']}"
+        }), 202
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/train/<job_id>', methods=['GET'])
+def train_status(job_id):
+    job = training_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown training job"}), 404
+    return jsonify(job)
+
+
 @app.route('/predict', methods=['POST'])
 def predict():
     try:
@@ -54,7 +473,7 @@ def predict():
             return jsonify({"error": "No text provided"}), 400
 
         text = data['text']
-        result = detector.predict(text)
+        result = predict_text(text)
 
         return jsonify({
             "input_text": text,
@@ -65,48 +484,200 @@ def predict():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/feedback', methods=['POST'])
+def submit_feedback():
+    global _feedback_unscheduled
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({"error": "No feedback provided"}), 400
+
+        items = data['items'] if 'items' in data else [data]
+        for item in items:
+            if (not isinstance(item, dict) or not isinstance(item.get('text'), str)
+                    or item.get('label') not in (0, 1)):
+                return jsonify({"error": "Each feedback item needs a text string and a label of 0 or 1"}), 400
+
+        feedback_log.append(items)
+
+        with _feedback_lock:
+            feedback_stats["received"] += len(items)
+            _feedback_unscheduled += len(items)
+            schedule = _feedback_unscheduled >= FEEDBACK_BATCH_SIZE or data.get('apply_now', False)
+            if schedule:
+                _feedback_unscheduled = 0
+        if schedule:
+            _feedback_updates.submit(apply_feedback)
+
+        return jsonify({
+            "accepted": len(items),
+            "incremental": hasattr(detector, 'updated_with'),
+            "update_scheduled": bool(schedule)
+        }), 202
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/feedback', methods=['GET'])
+def feedback_status():
+    with _feedback_lock:
+        stats = dict(feedback_stats)
+    stats["pending_bytes"] = feedback_log.pending_bytes()
+    stats["batch_size"] = FEEDBACK_BATCH_SIZE
+    stats["incremental"] = hasattr(detector, 'updated_with')
+    return jsonify(stats)
+
+
 @app.route('/stats', methods=['GET'])
 def get_stats():
     return jsonify({
         "model_trained": detector.is_trained,
         "model_type": "Logistic Regression with TF-IDF",
-        "features": "Text analysis using NLP"
+        "features": "Text analysis using NLP",
+        "model_version": model_version,
+        "registry_version": serving_version,
+        "prediction_cache": prediction_cache.stats(),
+        "micro_batching": micro_batcher.stats() if micro_batcher is not None else {"enabled": False},
+        "metrics": metrics.summary()
     })
 
 
+@app.route('/models', methods=['GET'])
+def list_models():
+    return jsonify({
+        "active": model_registry.active(),
+        "serving": serving_version,
+        "versions": model_registry.list()
+    })
+
+
+@app.route('/models/<version>/activate', methods=['POST'])
+def activate_model(version):
+    if model_registry.get(version) is None:
+        return jsonify({"error": "Unknown model version"}), 404
+    try:
+        previous = activate_version(version)
+        return jsonify({"active": version, "previous": previous})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/models/rollback', methods=['POST'])
+def rollback_model():
+    try:
+        return jsonify({"active": rollback_version()})
+    except RegistryError as e:
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/batch_predict', methods=['POST'])
 def batch_predict():
+    """Score a list of texts.
+
+    Query options: stream=1 returns newline-delimited JSON written as each
+    chunk is scored (also chosen by Accept: application/x-ndjson). An error
+    after the first chunk ends the stream with an {"error", "index"} line.
+    echo_text=0 returns only each item's index and prediction. The body may
+    be gzip-compressed with Content-Encoding: gzip.
+    """
     try:
-        data = request.get_json()
+        data = read_json_body()
 
         if not data or 'texts' not in data:
             return jsonify({"error": "No texts provided"}), 400
 
         texts = data['texts']
-        results = []
+        echo_text = query_flag('echo_text', True)
+        stream = query_flag('stream', request.accept_mimetypes.best == 'application/x-ndjson')
+        metrics.observe('batch_size', len(texts), (('endpoint', '/batch_predict'),), buckets=SIZE_BUCKETS)
 
-        for text in texts:
-            result = detector.predict(text)
-            results.append({
-                "text": text,
-                "prediction": result
-            })
+        def item(index, text, result):
+            if echo_text:
+                return {"text": text, "prediction": result}
+            return {"index": index, "prediction": result}
+
+        if stream:
+            def lines(start, chunk, results):
+                return ''.join(
+                    json.dumps(item(start + offset, text, result)) + '\n'
+                    for offset, (text, result) in enumerate(zip(chunk, results))
+                )
+
+            # Scored before the response starts, so a model error is still a
+            # clean 500 rather than a truncated 200
+            first = texts[:BATCH_CHUNK_SIZE]
+            first_lines = lines(0, first, predict_texts(first))
+
+            def generate():
+                yield first_lines
+                for start in range(BATCH_CHUNK_SIZE, len(texts), BATCH_CHUNK_SIZE):
+                    chunk = texts[start:start + BATCH_CHUNK_SIZE]
+                    try:
+                        results = predict_texts(chunk)
+                    except Exception as e:
+                        # The 200 is already sent; the error is the last line
+                        yield json.dumps({"error": str(e), "index": start}) + '\n'
+                        return
+                    yield lines(start, chunk, results)
+
+            return Response(generate(), mimetype='application/x-ndjson')
+
+        results = [
+            item(index, text, result)
+            for index, (text, result) in enumerate(zip(texts, predict_texts(texts)))
+        ]
 
         return jsonify({
             "predictions": results,
             "total_processed": len(results)
         })
 
+    except RequestBodyError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 if __name__ == '__main__':
+    import argparse
+    import sys
+
+    import_seconds = time.perf_counter() - _import_started
+
+    parser = argparse.ArgumentParser(description="Fake News Detection API")
+    parser.add_argument('--mode', choices=sorted(DETECTOR_CLASSES),
+                        help="which persisted model to serve (default: the active registry "
+                             "version, else full)")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="report import and model load time, then exit")
+    args = parser.parse_args()
+
     # Try to load pre-trained model
+    load_started = time.perf_counter()
     try:
-        detector.load_model()
+        if args.mode is None and model_registry.active():
+            serve_version(model_registry.active())
+        else:
+            load_model(args.mode or 'full')
         print("Pre-trained model loaded successfully!")
     except:
         print("No pre-trained model found. Please train the model first.")
+    load_seconds = time.perf_counter() - load_started
+
+    if args.profile_startup:
+        print(f"⏱️  Imports: {import_seconds * 1000:.1f} ms")
+        print(f"⏱️  Model load ({serving_version or args.mode or 'full'}): {load_seconds * 1000:.1f} ms")
+        print(f"⏱️  Total startup: {(import_seconds + load_seconds) * 1000:.1f} ms")
+        print(f"📦 pandas imported: {'pandas' in sys.modules}, sklearn imported: {'sklearn' in sys.modules}")
+        sys.exit(0)
 
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""Offline regression benchmark for FakeNewsDetector and the prediction API.
+
+For each corpus size it generates a dataset with
+generate_large_fake_news_dataset, times training, per-item predict() and
+/batch_predict through the Flask test client at several batch sizes and
+client concurrencies, and records peak RSS. Results are written as JSON.
+
+    python benchmarks/api_benchmark.py --output bench.json
+    python benchmarks/api_benchmark.py --compare bench.json --threshold 0.2
+
+With --compare the run exits non-zero if any metric is worse than the
+baseline by more than the threshold (a fraction, 0.2 = 20%).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generate_large_dataset import generate_large_fake_news_dataset  # noqa: E402
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def metric(value, unit, higher_is_better=False):
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+def bench_batch_predict(api, client_factory, texts, batch_size, concurrency, rounds):
+    """Items/second for /batch_predict with `concurrency` clients posting in parallel"""
+    batches = [texts[i:i + batch_size] for i in range(0, batch_size * rounds, batch_size)]
+    errors = []
+
+    def worker(worker_batches):
+        client = client_factory()
+        for batch in worker_batches:
+            response = client.post('/batch_predict', json={"texts": batch})
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+    api.prediction_cache.clear()
+    threads = [threading.Thread(target=worker, args=(batches[i::concurrency],)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    if errors:
+        raise RuntimeError(f"/batch_predict failed with status {errors[0]}")
+    return sum(len(b) for b in batches) / elapsed
+
+
+def run(args):
+    import app as api
+
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='fakenews-bench-')
+    previous_dir = os.getcwd()
+    os.chdir(workdir)
+    try:
+        for size in args.sizes:
+            random.seed(args.seed)
+            with contextlib.redirect_stdout(io.StringIO()):
+                dataset = generate_large_fake_news_dataset(size)
+            data_path = os.path.join(workdir, f'corpus_{size}.csv')
+            dataset.to_csv(data_path, index=False)
+            texts = dataset['text'].tolist()
+
+            detector = api.DETECTOR_CLASSES[args.mode]()
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                detector.train(data_path)
+            results[f"train/{args.mode}/n={size}"] = metric(time.perf_counter() - started, "seconds")
+            api.install_detector(detector)
+
+            sample = texts[:args.predict_calls]
+            started = time.perf_counter()
+            for text in sample:
+                detector.predict(text)
+            per_item = (time.perf_counter() - started) / len(sample)
+            results[f"predict/{args.mode}/n={size}"] = metric(per_item * 1000, "ms/item")
+
+            for batch_size in args.batch_sizes:
+                base = (texts * (batch_size * args.rounds // len(texts) + 1))[:batch_size * args.rounds]
+                for concurrency in args.concurrency:
+                    # The generator repeats a few hundred headlines, so each text gets a
+                    # run-specific suffix; otherwise the prediction cache and in-batch
+                    # dedupe answer most requests and the model is never measured
+                    pool = [f"{text} #{batch_size}-{concurrency}-{i}" for i, text in enumerate(base)]
+                    throughput = bench_batch_predict(api, api.app.test_client, pool, batch_size,
+                                                     concurrency, args.rounds)
+                    key = f"batch_predict/{args.mode}/n={size}/batch={batch_size}/concurrency={concurrency}"
+                    results[key] = metric(throughput, "items/s", higher_is_better=True)
+
+            results[f"peak_rss/{args.mode}/n={size}"] = metric(peak_rss_mb(), "MiB")
+    finally:
+        os.chdir(previous_dir)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.time(),
+            "args": {k: v for k, v in vars(args).items() if k not in ('output', 'compare')}
+        },
+        "results": results
+    }
+
+
+def compare(current, baseline, threshold):
+    """Return the list of metrics that regressed by more than threshold"""
+    regressions = []
+    print(f"\n{'metric':<70} {'baseline':>12} {'current':>12} {'change':>8}")
+    for key, entry in sorted(current["results"].items()):
+        base = baseline["results"].get(key)
+        if base is None or not base["value"]:
+            continue
+        change = (entry["value"] - base["value"]) / base["value"]
+        worse = -change if entry["higher_is_better"] else change
+        flag = "  REGRESSED" if worse > threshold else ""
+        print(f"{key:<70} {base['value']:>12.4f} {entry['value']:>12.4f} {change:>+7.1%}{flag}")
+        if worse > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark for the Fake News Detection API")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000])
+    parser.add_argument('--mode', default='full', help="detector to train: full or streaming")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--rounds', type=int, default=20, help="batches posted per measurement")
+    parser.add_argument('--predict-calls', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', help="baseline JSON from an earlier run")
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    for key, entry in report["results"].items():
+        print(f"{key:<70} {entry['value']:>12.4f} {entry['unit']}")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Saved results to '{args.output}'")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+            return 1
+        print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
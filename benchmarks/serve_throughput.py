@@ -0,0 +1,105 @@
+"""Measure /predict throughput of serve.py as the number of workers grows.
+
+Starts serve.py once per worker count, drives it with concurrent keep-alive
+clients for a fixed duration and prints requests/second and the speedup over
+a single worker. Needs a model already saved by /train for the chosen mode.
+
+    python benchmarks/serve_throughput.py --mode streaming --workers 1 2 4 8
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEADLINES = [
+    "BREAKING: alien technology discovered - scientists stunned",
+    "City implements literacy program",
+    "Miracle free energy cures diabetes",
+    "Research confirms education reform benefits rural communities",
+    "Government hiding time travel",
+    "New community center opens"
+]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def client_loop(port, stop_at, counts, index):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    done = 0
+    while time.time() < stop_at:
+        body = json.dumps({"text": HEADLINES[(index + done) % len(HEADLINES)] + f" #{done}"})
+        conn.request('POST', '/predict', body=body, headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        if response.will_close:
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        done += 1
+    conn.close()
+    counts[index] = done
+
+
+def measure(workers, mode, concurrency, duration):
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'serve.py'), '--workers', str(workers),
+         '--port', str(port), '--host', '127.0.0.1', '--mode', mode],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_port(port)
+        counts = [0] * concurrency
+        stop_at = time.time() + duration
+        threads = [threading.Thread(target=client_loop, args=(port, stop_at, counts, i))
+                   for i in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return sum(counts) / duration
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mode', default='full')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    # Unique suffixes per request keep the prediction cache out of the measurement
+    baseline = None
+    print(f"{'workers':>8} {'req/s':>10} {'speedup':>8}")
+    for workers in args.workers:
+        throughput = measure(workers, args.mode, args.concurrency, args.duration)
+        baseline = baseline or throughput
+        print(f"{workers:>8} {throughput:>10.1f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
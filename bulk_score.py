@@ -0,0 +1,170 @@
+"""Offline bulk scorer for large files.
+
+Streams texts from a CSV, JSON Lines, Parquet or Arrow file, scores them in
+fixed-size vectorized chunks across a process pool and writes one JSON line
+per input row, in input order. Only a bounded number of chunks is in flight,
+so memory does not grow with the file.
+
+    python bulk_score.py articles.parquet scores.jsonl --workers 4
+    python bulk_score.py articles.parquet scores.jsonl --mode streaming --resume
+
+The registry's active model version is used unless --mode names a model
+saved at its fixed path.
+
+With --store, predictions are looked up in (and added to) a persistent
+PredictionStore first, so re-running over mostly unchanged articles only
+runs the model on new texts.
+
+    python bulk_score.py articles.parquet scores.jsonl --store data/predictions.sqlite
+
+With --resume, scoring continues after the last row index in the output
+(so it also works for outputs started with --start-offset); a partially
+written last line from an interrupted run is discarded first.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from dataset_io import iter_dataset_chunks
+from detectors import DETECTOR_CLASSES, load_detector, predict_many
+from prediction_store import PredictionStore, model_fingerprint, score_with_store
+
+# Set in each worker by _init_worker
+_detector = None
+_store = None
+_model_id = None
+
+
+def _init_worker(mode, store_path=None):
+    global _detector, _store, _model_id
+    _detector = load_detector(mode)
+    if store_path is not None:
+        _store = PredictionStore(store_path)
+        _model_id = model_fingerprint(_detector)
+
+
+def score_rows(start, texts, include_text):
+    """Score one chunk; returns (JSON lines, texts run through the model)"""
+    if _store is not None:
+        results, scored, _ = score_with_store(_detector, _store, _model_id, texts)
+    else:
+        results = predict_many(_detector, texts)
+        scored = len(texts)
+    lines = []
+    for offset, (text, result) in enumerate(zip(texts, results)):
+        row = {"index": start + offset, "prediction": result}
+        if include_text:
+            row["text"] = text
+        lines.append(json.dumps(row, ensure_ascii=False))
+    return '\n'.join(lines) + '\n', scored
+
+
+def next_index(output_path):
+    """Input row after the last complete line in output_path, or None if it
+    has none; a trailing partial line is truncated"""
+    if not os.path.exists(output_path):
+        return None
+    last_line = None
+    valid_bytes = 0
+    with open(output_path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            last_line = line
+            valid_bytes += len(line)
+    with open(output_path, 'r+b') as f:
+        f.truncate(valid_bytes)
+    return json.loads(last_line)["index"] + 1 if last_line is not None else None
+
+
+def iter_text_chunks(path, chunk_size, skip_rows):
+    """Yield (start_index, texts) for fixed-size chunks after skip_rows rows"""
+    position = 0
+    pending, pending_start = [], skip_rows
+    for frame in iter_dataset_chunks(path, columns=['text'], chunksize=chunk_size):
+        texts = frame['text'].fillna('').astype(str).tolist()
+        if position + len(texts) <= skip_rows:
+            position += len(texts)
+            continue
+        if position < skip_rows:
+            texts = texts[skip_rows - position:]
+            position = skip_rows
+        position += len(texts)
+        pending.extend(texts)
+        while len(pending) >= chunk_size:
+            yield pending_start, pending[:chunk_size]
+            pending = pending[chunk_size:]
+            pending_start += chunk_size
+    if pending:
+        yield pending_start, pending
+
+
+def bulk_score(input_path, output_path, mode=None, workers=None, chunk_size=2000,
+               include_text=False, start_offset=0, resume=False, progress_every=5.0, store_path=None):
+    workers = workers or os.cpu_count() or 1
+    if resume:
+        resume_index = next_index(output_path)
+        if resume_index is not None:
+            start_offset = resume_index
+    max_in_flight = workers * 2
+
+    started = last_report = time.perf_counter()
+    written = scored = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(mode, store_path)) as pool, \
+            open(output_path, 'a' if resume else 'w', encoding='utf-8') as out:
+        in_flight = deque()
+
+        def drain_one():
+            nonlocal written, scored, last_report
+            count, future = in_flight.popleft()
+            lines, chunk_scored = future.result()
+            out.write(lines)
+            written += count
+            scored += chunk_scored
+            now = time.perf_counter()
+            if now - last_report >= progress_every:
+                last_report = now
+                print(f"⏳ {start_offset + written} rows scored ({written / (now - started):.0f} rows/s)",
+                      file=sys.stderr)
+
+        for start, texts in iter_text_chunks(input_path, chunk_size, start_offset):
+            if len(in_flight) >= max_in_flight:
+                drain_one()
+            in_flight.append((len(texts), pool.submit(score_rows, start, texts, include_text)))
+        while in_flight:
+            drain_one()
+
+    elapsed = time.perf_counter() - started
+    return {"start_offset": start_offset, "rows": written, "scored": scored, "seconds": elapsed,
+            "rows_per_second": written / elapsed if elapsed else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a large file with FakeNewsDetector")
+    parser.add_argument('input')
+    parser.add_argument('output', help="JSON Lines output, one row per input row")
+    parser.add_argument('--mode', choices=sorted(DETECTOR_CLASSES),
+                        help="fixed-path model to load (default: the active registry version, else full)")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    parser.add_argument('--include-text', action='store_true', help="echo the input text in each row")
+    parser.add_argument('--start-offset', type=int, default=0, help="skip this many input rows")
+    parser.add_argument('--resume', action='store_true', help="continue after the rows already in output")
+    parser.add_argument('--progress-every', type=float, default=5.0, help="seconds between progress lines")
+    parser.add_argument('--store', help="PredictionStore SQLite file to reuse and extend")
+    args = parser.parse_args(argv)
+
+    stats = bulk_score(args.input, args.output, args.mode, args.workers, args.chunk_size,
+                       args.include_text, args.start_offset, args.resume, args.progress_every, args.store)
+    print(f"✅ Scored {stats['rows']} rows from offset {stats['start_offset']} in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_second']:.0f} rows/s) -> '{args.output}'")
+    if args.store:
+        print(f"   💾 Model run on {stats['scored']} texts; the rest came from '{args.store}'")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,358 @@
+"""Compact serving artifact for TF-IDF + linear models.
+
+A trained model is exported as a single .npz holding the vocabulary as a
+string array, float32 IDF weights and a float32 coefficient vector. Loading
+it needs only NumPy (no sklearn, no pickle), which keeps cold start in the
+millisecond range.
+
+The quantized variant goes further for memory-constrained serving: the
+vocabulary is a sorted byte-string array searched with np.searchsorted
+instead of a dict, the IDF weights are folded into the coefficients, and
+those are stored as float16 or int8 with a scale factor.
+
+    python compact_model.py export --out compact_model.npz
+    python compact_model.py export --quantize int8 --out quantized_model.npz
+    python compact_model.py report data/fake_news_data.csv
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from collections import Counter
+
+import numpy as np
+
+from metrics import registry as metrics
+
+FORMAT_VERSION = 1
+QUANTIZED_FORMAT_VERSION = 2
+QUANTIZATIONS = ('float16', 'int8')
+
+
+def _vectorizer_config(vectorizer, classifier):
+    if getattr(vectorizer, 'analyzer', 'word') != 'word' or getattr(vectorizer, 'strip_accents', None):
+        raise ValueError("Compact export supports word analyzers without accent stripping only")
+    if getattr(vectorizer, 'preprocessor', None) or getattr(vectorizer, 'tokenizer', None):
+        raise ValueError("Compact export does not support custom preprocessors or tokenizers")
+
+    stop_words = vectorizer.get_stop_words()
+    return {
+        "format_version": FORMAT_VERSION,
+        "lowercase": bool(vectorizer.lowercase),
+        "token_pattern": vectorizer.token_pattern,
+        "ngram_range": list(vectorizer.ngram_range),
+        "stop_words": sorted(stop_words) if stop_words else [],
+        "sublinear_tf": bool(getattr(vectorizer, 'sublinear_tf', False)),
+        "use_idf": hasattr(vectorizer, 'idf_'),
+        "norm": getattr(vectorizer, 'norm', None),
+        "classes": [int(c) for c in classifier.classes_]
+    }
+
+
+def _terms_by_index(vocabulary):
+    terms = np.empty(len(vocabulary), dtype=object)
+    for term, index in vocabulary.items():
+        terms[index] = term
+    return terms
+
+
+def export_compact(vectorizer, classifier, path='compact_model.npz', quantize=None):
+    """Write a fitted TfidfVectorizer/linear classifier pair as a compact artifact.
+
+    With quantize set to 'float16' or 'int8' the quantized format is written
+    instead (see export_quantized).
+    """
+    if quantize:
+        return export_quantized(vectorizer, classifier, path, quantize)
+
+    config = _vectorizer_config(vectorizer, classifier)
+    terms = _terms_by_index(vectorizer.vocabulary_)
+    idf = vectorizer.idf_ if config["use_idf"] else np.ones(len(terms))
+
+    np.savez(
+        path,
+        terms=terms.astype(str),
+        idf=idf.astype(np.float32),
+        coef=classifier.coef_.ravel().astype(np.float32),
+        intercept=np.asarray(classifier.intercept_, dtype=np.float32).ravel(),
+        config=np.array(json.dumps(config))
+    )
+    return path
+
+
+def export_quantized(vectorizer, classifier, path='quantized_model.npz', quantize='int8'):
+    """Write the quantized format: sorted UTF-8 terms, IDF folded into the
+    coefficients, coefficients as float16 or int8.
+
+    The decision function only needs coef * idf per term, so that product is
+    what gets quantized. A float16 copy of the IDF weights is kept only when
+    the vectorizer normalizes rows, since the row norm still depends on them.
+    """
+    if quantize not in QUANTIZATIONS:
+        raise ValueError(f"quantize must be one of {', '.join(QUANTIZATIONS)}")
+
+    config = _vectorizer_config(vectorizer, classifier)
+    terms = np.array([term.encode('utf-8') for term in _terms_by_index(vectorizer.vocabulary_)])
+    order = np.argsort(terms, kind='stable')
+    idf = (vectorizer.idf_ if config["use_idf"] else np.ones(len(terms)))[order]
+    folded = classifier.coef_.ravel()[order] * idf
+
+    if quantize == 'int8':
+        peak = float(np.abs(folded).max()) if len(folded) else 0.0
+        scale = peak / 127 if peak else 1.0
+        coef = np.round(folded / scale).astype(np.int8)
+    else:
+        scale = 1.0
+        coef = folded.astype(np.float16)
+
+    config.update(format_version=QUANTIZED_FORMAT_VERSION, quantize=quantize)
+    arrays = {
+        "terms": terms[order],
+        "coef": coef,
+        "coef_scale": np.array([scale], dtype=np.float32),
+        "intercept": np.asarray(classifier.intercept_, dtype=np.float32).ravel(),
+        "config": np.array(json.dumps(config))
+    }
+    if config["norm"]:
+        arrays["idf"] = idf.astype(np.float16)
+    np.savez(path, **arrays)
+    return path
+
+
+def export_detector(detector, path='compact_model.npz', quantize=None):
+    """Export a trained FakeNewsDetector, which keeps its TF-IDF step in
+    `vectorizer` and its classifier in `model`"""
+    vectorizer = getattr(detector, 'vectorizer', None)
+    classifier = getattr(detector, 'model', None)
+    if vectorizer is None or classifier is None:
+        raise ValueError("Detector has no fitted `vectorizer`/`model` pair to export")
+    return export_compact(vectorizer, classifier, path, quantize)
+
+
+class CompactFakeNewsDetector:
+    """Serves predictions from a compact artifact with the FakeNewsDetector interface.
+
+    Reads both the float32 format and the quantized one. Internally the
+    coefficients are always kept with IDF folded in, so both formats share
+    the scoring path and differ only in vocabulary lookup and storage dtype.
+    """
+
+    default_path = 'compact_model.npz'
+
+    def __init__(self):
+        self.is_trained = False
+
+    def load_model(self, path=None):
+        path = path or self.default_path
+        with np.load(path, allow_pickle=False) as artifact:
+            config = json.loads(str(artifact['config']))
+            version = config["format_version"]
+            if version == FORMAT_VERSION:
+                terms = artifact['terms']
+                idf = artifact['idf']
+                self.coef = artifact['coef'] * idf
+                self.coef_scale = 1.0
+                self.idf = idf
+                self.vocabulary = {term: index for index, term in enumerate(terms.tolist())}
+                self.sorted_terms = None
+            elif version == QUANTIZED_FORMAT_VERSION:
+                self.sorted_terms = artifact['terms']
+                self.coef = artifact['coef']
+                self.coef_scale = float(artifact['coef_scale'][0])
+                self.idf = artifact['idf'] if 'idf' in artifact.files else None
+                self.vocabulary = None
+            else:
+                raise ValueError(f"Unsupported compact model format: {version}")
+            self.intercept = float(artifact['intercept'][0])
+
+        self.quantize = config.get("quantize")
+        self.lowercase = config["lowercase"]
+        self.token_re = re.compile(config["token_pattern"])
+        self.ngram_range = tuple(config["ngram_range"])
+        self.stop_words = frozenset(config["stop_words"])
+        self.sublinear_tf = config["sublinear_tf"]
+        self.norm = config["norm"]
+        self.fake_class_index = config["classes"].index(1) if 1 in config["classes"] else 1
+        self.is_trained = True
+
+    def _terms(self, text):
+        if self.lowercase:
+            text = text.lower()
+        tokens = [t for t in self.token_re.findall(text) if t not in self.stop_words]
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            for i in range(len(tokens) - n + 1):
+                yield tokens[i] if n == 1 else ' '.join(tokens[i:i + n])
+
+    def _lookup(self, terms):
+        """Vocabulary indices for terms, -1 where a term is unknown"""
+        if self.vocabulary is not None:
+            get = self.vocabulary.get
+            return np.fromiter((get(term, -1) for term in terms), dtype=np.int64, count=len(terms))
+        keys = np.array([term.encode('utf-8') for term in terms])
+        positions = np.searchsorted(self.sorted_terms, keys)
+        positions[positions == len(self.sorted_terms)] = 0
+        return np.where(self.sorted_terms[positions] == keys, positions, -1)
+
+    def _vectorize(self, text):
+        """Sparse row as (indices, term weights, norm), or None if no term is
+        known. The weights exclude IDF, which is folded into the coefficients."""
+        counts = Counter(self._terms(text))
+        if not counts:
+            return None
+        indices = self._lookup(list(counts))
+        known = indices >= 0
+        if not known.any():
+            return None
+
+        indices = indices[known]
+        weights = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))[known]
+        if self.sublinear_tf:
+            weights = 1 + np.log(weights)
+        if self.norm is None:
+            return indices, weights, 1.0
+        scaled = weights * self.idf[indices].astype(np.float32)
+        if self.norm == 'l2':
+            return indices, weights, float(np.sqrt(np.dot(scaled, scaled)))
+        return indices, weights, float(np.abs(scaled).sum())
+
+    def _decision(self, row):
+        if row is None:
+            return self.intercept
+        indices, weights, norm = row
+        coef = self.coef[indices].astype(np.float32)
+        return float(np.dot(weights, coef)) * self.coef_scale / norm + self.intercept
+
+    def predict_batch(self, texts):
+        with metrics.timer('model_stage_seconds', (('stage', 'vectorize'),)):
+            rows = [self._vectorize(text) for text in texts]
+        with metrics.timer('model_stage_seconds', (('stage', 'score'),)):
+            decisions = [self._decision(row) for row in rows]
+
+        results = []
+        for decision in decisions:
+            p = 1.0 / (1.0 + np.exp(-decision))
+            if self.fake_class_index == 0:
+                p = 1.0 - p
+            results.append({
+                "label": "FAKE" if p >= 0.5 else "REAL",
+                "confidence": float(p if p >= 0.5 else 1 - p),
+                "fake_probability": float(p)
+            })
+        return results
+
+    def predict(self, text):
+        return self.predict_batch([text])[0]
+
+    def memory_bytes(self):
+        """Approximate resident size of the model's lookup and weight tables"""
+        total = self.coef.nbytes + (self.idf.nbytes if self.idf is not None else 0)
+        if self.sorted_terms is not None:
+            return total + self.sorted_terms.nbytes
+        return total + _dict_bytes(self.vocabulary)
+
+
+class QuantizedFakeNewsDetector(CompactFakeNewsDetector):
+    """CompactFakeNewsDetector reading the quantized artifact by default"""
+
+    default_path = 'quantized_model.npz'
+
+
+def _dict_bytes(vocabulary):
+    return sys.getsizeof(vocabulary) + sum(sys.getsizeof(term) + sys.getsizeof(index)
+                                           for term, index in vocabulary.items())
+
+
+def full_model_bytes(detector):
+    """Approximate size of a FakeNewsDetector's vocabulary dict, IDF and coefficients"""
+    vectorizer, classifier = detector.vectorizer, detector.model
+    total = _dict_bytes(vectorizer.vocabulary_) + classifier.coef_.nbytes
+    if hasattr(vectorizer, 'idf_'):
+        total += vectorizer.idf_.nbytes
+    return total
+
+
+def _fake_probabilities(detector, texts):
+    from detectors import predict_many
+
+    results = predict_many(detector, texts)
+    return np.array([
+        r["fake_probability"] if "fake_probability" in r
+        else (r["confidence"] if r["label"] == "FAKE" else 1 - r["confidence"])
+        for r in results
+    ])
+
+
+def compare_variants(detector, data_path):
+    """Accuracy, agreement and memory of each compact variant against the full model"""
+    from dataset_io import read_dataset
+
+    df = read_dataset(data_path, columns=['text', 'label']).dropna()
+    texts = df['text'].astype(str).tolist()
+    labels = df['label'].astype(int).to_numpy()
+    reference = _fake_probabilities(detector, texts)
+
+    rows = [{
+        "variant": "full",
+        "accuracy": float(np.mean((reference >= 0.5) == labels)),
+        "agreement": 1.0,
+        "max_probability_delta": 0.0,
+        "memory_bytes": full_model_bytes(detector),
+        "file_bytes": None
+    }]
+    with tempfile.TemporaryDirectory() as tmp:
+        for quantize in (None, *QUANTIZATIONS):
+            path = os.path.join(tmp, f"{quantize or 'float32'}.npz")
+            export_detector(detector, path, quantize)
+            compact = CompactFakeNewsDetector()
+            compact.load_model(path)
+            probabilities = _fake_probabilities(compact, texts)
+            rows.append({
+                "variant": quantize or "float32",
+                "accuracy": float(np.mean((probabilities >= 0.5) == labels)),
+                "agreement": float(np.mean((probabilities >= 0.5) == (reference >= 0.5))),
+                "max_probability_delta": float(np.abs(probabilities - reference).max()),
+                "memory_bytes": compact.memory_bytes(),
+                "file_bytes": os.path.getsize(path)
+            })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a trained FakeNewsDetector as a compact artifact")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export = subparsers.add_parser('export')
+    export.add_argument('--out')
+    export.add_argument('--quantize', choices=QUANTIZATIONS,
+                        help="write the quantized format (default out: quantized_model.npz)")
+    report = subparsers.add_parser('report', help="compare accuracy and memory of every compact variant")
+    report.add_argument('data_path', nargs='?', default='data/fake_news_data.csv')
+    args = parser.parse_args(argv)
+
+    from model import FakeNewsDetector
+
+    detector = FakeNewsDetector()
+    detector.load_model()
+
+    if args.command == 'export':
+        out = args.out or (QuantizedFakeNewsDetector.default_path if args.quantize
+                           else CompactFakeNewsDetector.default_path)
+        export_detector(detector, out, args.quantize)
+        print(f"💾 Saved compact model as '{out}'")
+        return
+
+    rows = compare_variants(detector, args.data_path)
+    full = rows[0]
+    print(f"📊 Compact variants on '{args.data_path}'\n")
+    print(f"{'variant':>8} {'accuracy':>9} {'delta':>8} {'agree':>7} {'max |dp|':>9} {'memory':>10} {'file':>10}")
+    for row in rows:
+        file_size = f"{row['file_bytes'] / 1024:.0f} KiB" if row['file_bytes'] else '-'
+        print(f"{row['variant']:>8} {row['accuracy']:>9.4f} {row['accuracy'] - full['accuracy']:>+8.4f} "
+              f"{row['agreement']:>7.2%} {row['max_probability_delta']:>9.5f} "
+              f"{row['memory_bytes'] / 1024:>6.0f} KiB {file_size:>10}")
+
+
+if __name__ == '__main__':
+    main()
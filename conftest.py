@@ -0,0 +1,6 @@
+# Puts the top-level modules on sys.path for the tests; the expense tracker
+# lives in its own directory, so that is added too
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "python expense tracker prjct"))
@@ -0,0 +1,205 @@
+"""Reading and writing datasets as CSV, JSON Lines, Parquet or Arrow IPC.
+
+Columnar files are read with column projection instead of parsing text, and
+Arrow IPC files are memory-mapped. pandas and pyarrow are imported on first
+use, so importing this module (e.g. for preferred_path in the API) is cheap
+and CSV-only setups do not need pyarrow.
+
+    python dataset_io.py convert data/fake_news_data.csv data/fake_news_data.parquet
+"""
+import argparse
+import os
+
+# File extension -> format name
+FORMATS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow'
+}
+
+# Columnar siblings preferred over a CSV with the same stem, fastest first
+COLUMNAR_EXTENSIONS = ('.arrow', '.parquet')
+
+
+def dataset_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported dataset format: {path}")
+    return FORMATS[extension]
+
+
+def preferred_path(path):
+    """Return a columnar copy of path (same name, .arrow/.parquet) if one exists"""
+    stem = os.path.splitext(path)[0]
+    for extension in COLUMNAR_EXTENSIONS:
+        if os.path.exists(stem + extension):
+            return stem + extension
+    return path
+
+
+def _open_arrow(path):
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(path, 'r'))
+
+
+def dataset_columns(path):
+    fmt = dataset_format(path)
+    if fmt == 'csv':
+        import pandas as pd
+
+        return list(pd.read_csv(path, nrows=0).columns)
+    if fmt == 'jsonl':
+        import json
+
+        with open(path, encoding='utf-8') as f:
+            first = f.readline()
+        return list(json.loads(first)) if first.strip() else []
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).schema_arrow.names
+    return _open_arrow(path).schema.names
+
+
+def read_dataset(path, columns=None):
+    """Load a whole dataset, reading only `columns` when given"""
+    import pandas as pd
+
+    fmt = dataset_format(path)
+    if fmt == 'csv':
+        return pd.read_csv(path, usecols=columns)
+    if fmt == 'jsonl':
+        df = pd.read_json(path, lines=True, dtype=False)
+        return df[columns] if columns is not None else df
+    if fmt == 'parquet':
+        return pd.read_parquet(path, columns=columns)
+    table = _open_arrow(path).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas()
+
+
+def iter_dataset_chunks(path, columns=None, chunksize=100000):
+    """Yield DataFrames of at most chunksize rows"""
+    fmt = dataset_format(path)
+    if fmt == 'csv':
+        import pandas as pd
+
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+    elif fmt == 'jsonl':
+        import pandas as pd
+
+        with pd.read_json(path, lines=True, chunksize=chunksize, dtype=False) as reader:
+            for chunk in reader:
+                yield chunk[columns] if columns is not None else chunk
+    elif fmt == 'parquet':
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        reader = _open_arrow(path)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            for start in range(0, batch.num_rows, chunksize):
+                yield batch.slice(start, chunksize).to_pandas()
+
+
+def write_dataset(df, path):
+    fmt = dataset_format(path)
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+    elif fmt == 'jsonl':
+        df.to_json(path, orient='records', lines=True, force_ascii=False)
+    elif fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+class DatasetWriter:
+    """Writes a dataset chunk by chunk in any supported format.
+
+    Use as a context manager and call write(df) for each chunk; the schema of
+    columnar outputs is taken from the first chunk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.format = dataset_format(path)
+        self.rows = 0
+        self._writer = None
+        self._sink = None
+        self._schema = None
+
+    def write(self, df):
+        if self.format == 'csv':
+            df.to_csv(self.path, index=False, mode='a' if self.rows else 'w', header=not self.rows)
+        elif self.format == 'jsonl':
+            df.to_json(self.path, orient='records', lines=True, force_ascii=False, mode='a' if self.rows else 'w')
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                if self.format == 'parquet':
+                    self._writer = pq.ParquetWriter(self.path, self._schema)
+                else:
+                    self._sink = pa.OSFile(self.path, 'wb')
+                    self._writer = pa.ipc.new_file(self._sink, self._schema)
+            self._writer.write_table(table.cast(self._schema))
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def convert_dataset(source, target, chunksize=100000):
+    """Stream source into target chunk by chunk; returns the number of rows"""
+    with DatasetWriter(target) as writer:
+        for chunk in iter_dataset_chunks(source, chunksize=chunksize):
+            writer.write(chunk)
+    return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert datasets between CSV, Parquet and Arrow IPC")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    convert = subparsers.add_parser('convert')
+    convert.add_argument('source')
+    convert.add_argument('target')
+    convert.add_argument('--chunksize', type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    if args.command == 'convert':
+        rows = convert_dataset(args.source, args.target, args.chunksize)
+        print(f"💾 Converted {rows} rows from '{args.source}' to '{args.target}'")
+
+
+if __name__ == '__main__':
+    main()
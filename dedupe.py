@@ -0,0 +1,204 @@
+"""Near-duplicate detection for training corpora with MinHash and LSH.
+
+Texts are normalized (lower-cased, whitespace collapsed), cut into character
+shingles and summarised as MinHash signatures. Locality-sensitive hashing
+over signature bands finds candidate matches, which are confirmed when the
+estimated Jaccard similarity reaches the threshold. Exact repeats are caught
+before any of that by a hash of the normalized text.
+
+    python dedupe.py dedupe data/fake_news_data.csv data/fake_news_dedup.csv --check-leakage
+    python dedupe.py leakage data/fake_news_data.csv
+"""
+import argparse
+import hashlib
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset_io import DatasetWriter, iter_dataset_chunks
+
+
+def normalize_text(text):
+    return ' '.join(str(text).lower().split())
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold=0.8, num_perm=64, bands=16, shingle_size=5, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash family; uint64 arithmetic wraps around
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+        self._exact = {}
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = []
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _shingles(self, normalized):
+        k = self.shingle_size
+        if len(normalized) <= k:
+            return [normalized]
+        return [normalized[i:i + k] for i in range(len(normalized) - k + 1)]
+
+    def signature(self, normalized):
+        hashes = pd.util.hash_array(np.array(self._shingles(normalized), dtype=object))
+        return ((np.outer(self._a, hashes) + self._b[:, None]) >> np.uint64(32)).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        r = self.rows_per_band
+        return [signature[i * r:(i + 1) * r].tobytes() for i in range(self.bands)]
+
+    def _exact_key(self, normalized):
+        return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+
+    def query(self, text):
+        """Return the id of an indexed near-duplicate of text, or None"""
+        match, _, _ = self._lookup(normalize_text(text))
+        return match
+
+    def _lookup(self, normalized):
+        exact_key = self._exact_key(normalized)
+        if exact_key in self._exact:
+            return self._exact[exact_key], exact_key, None
+
+        signature = self.signature(normalized)
+        candidates = set()
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(band.get(key, ()))
+        best, best_similarity = None, self.threshold
+        for candidate in candidates:
+            similarity = float(np.mean(self._signatures[candidate] == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = candidate, similarity
+        return best, exact_key, signature
+
+    def add(self, text):
+        """Index text unless it duplicates an indexed one.
+
+        Returns (doc_id, is_duplicate); for duplicates doc_id is the match.
+        """
+        normalized = normalize_text(text)
+        match, exact_key, signature = self._lookup(normalized)
+        if match is not None:
+            if signature is not None:
+                # Remember the variant so its exact repeats skip MinHash
+                self._exact[exact_key] = match
+            return match, True
+
+        doc_id = len(self._signatures)
+        self._signatures.append(signature)
+        self._exact[exact_key] = doc_id
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            band.setdefault(key, []).append(doc_id)
+        return doc_id, False
+
+
+def dedupe_dataset(source, target, threshold=0.8, chunksize=100000):
+    """Stream source into target, dropping rows whose text nearly duplicates an earlier row"""
+    index = NearDuplicateIndex(threshold=threshold)
+    started = time.perf_counter()
+    rows_in = 0
+    with DatasetWriter(target) as writer:
+        for chunk in iter_dataset_chunks(source, chunksize=chunksize):
+            rows_in += len(chunk)
+            keep = [not index.add(text)[1] for text in chunk['text'].fillna('').astype(str)]
+            writer.write(chunk[keep])
+    return {
+        "rows_in": rows_in,
+        "rows_out": writer.rows,
+        "removed": rows_in - writer.rows,
+        "reduction": (rows_in - writer.rows) / rows_in if rows_in else 0.0,
+        "seconds": time.perf_counter() - started
+    }
+
+
+def find_leakage(path, test_every=5, threshold=0.8, chunksize=100000):
+    """Count held-out rows with a near-duplicate among the training rows.
+
+    Uses the same split as StreamingFakeNewsDetector: every test_every-th row
+    is held out.
+    """
+    index = NearDuplicateIndex(threshold=threshold)
+    offset = 0
+    for chunk in iter_dataset_chunks(path, columns=['text'], chunksize=chunksize):
+        for position, text in enumerate(chunk['text'].fillna('').astype(str), start=offset):
+            if position % test_every:
+                index.add(text)
+        offset += len(chunk)
+
+    test_rows = leaked = 0
+    offset = 0
+    for chunk in iter_dataset_chunks(path, columns=['text'], chunksize=chunksize):
+        for position, text in enumerate(chunk['text'].fillna('').astype(str), start=offset):
+            if position % test_every == 0:
+                test_rows += 1
+                leaked += index.query(text) is not None
+        offset += len(chunk)
+    return {"test_rows": test_rows, "leaked": leaked, "leak_rate": leaked / test_rows if test_rows else 0.0}
+
+
+def time_training(path, mode):
+    if mode == 'streaming':
+        from streaming_model import StreamingFakeNewsDetector as detector_class
+    else:
+        from model import FakeNewsDetector as detector_class
+    started = time.perf_counter()
+    detector_class().train(path)
+    return time.perf_counter() - started
+
+
+def print_leakage(label, leakage):
+    print(f"   🔍 {label}: {leakage['leaked']} of {leakage['test_rows']} test rows "
+          f"({leakage['leak_rate'] * 100:.1f}%) have a near-duplicate in the training rows")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Near-duplicate removal for training corpora")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    dedupe = subparsers.add_parser('dedupe', help="write a copy without near-duplicate rows")
+    dedupe.add_argument('source')
+    dedupe.add_argument('target')
+    dedupe.add_argument('--threshold', type=float, default=0.8)
+    dedupe.add_argument('--check-leakage', action='store_true')
+    dedupe.add_argument('--time-training', choices=['full', 'streaming'])
+
+    leakage = subparsers.add_parser('leakage', help="report train/test near-duplicate leakage")
+    leakage.add_argument('path')
+    leakage.add_argument('--threshold', type=float, default=0.8)
+    leakage.add_argument('--test-every', type=int, default=5)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'leakage':
+        print_leakage(args.path, find_leakage(args.path, args.test_every, args.threshold))
+        return
+
+    stats = dedupe_dataset(args.source, args.target, args.threshold)
+    print(f"🧹 Deduplicated '{args.source}' -> '{args.target}' in {stats['seconds']:.2f}s")
+    print(f"   📉 Rows: {stats['rows_in']} -> {stats['rows_out']} "
+          f"({stats['removed']} removed, {stats['reduction'] * 100:.1f}% reduction)")
+
+    if args.check_leakage:
+        print_leakage("Before", find_leakage(args.source, threshold=args.threshold))
+        print_leakage("After", find_leakage(args.target, threshold=args.threshold))
+
+    if args.time_training:
+        before = time_training(args.source, args.time_training)
+        after = time_training(args.target, args.time_training)
+        print(f"   ⏱️  Training ({args.time_training}): {before:.2f}s -> {after:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""The persisted detector types and how to load and call them.
+
+Importing this module has no side effects (no Flask app, registry, feedback
+log or training pool), so offline tools and pool workers can use it instead
+of importing app.py.
+"""
+import os
+
+from compact_model import CompactFakeNewsDetector, QuantizedFakeNewsDetector
+from model_registry import STATE_NAME, ModelRegistry
+from streaming_model import StreamingFakeNewsDetector
+
+
+def full_detector():
+    # model.py pulls in pandas/sklearn, so it is imported on first use
+    from model import FakeNewsDetector
+
+    return FakeNewsDetector()
+
+
+# Persisted model types that can be served, and the detector class (or
+# factory) for each
+DETECTOR_CLASSES = {
+    "full": full_detector,
+    "streaming": StreamingFakeNewsDetector,
+    "compact": CompactFakeNewsDetector,
+    "quantized": QuantizedFakeNewsDetector
+}
+
+# Detector modes whose registered artifacts are loaded with joblib
+# mmap_mode='r'; versions are immutable, so processes can share the mapping
+MMAP_MODES = {"streaming"}
+
+
+def predict_many(detector, texts):
+    """One model call for a list of texts, or per-item predict() for
+    detectors without predict_batch()"""
+    predict_batch = getattr(detector, 'predict_batch', None)
+    if predict_batch is not None:
+        return predict_batch(texts)
+    return [detector.predict(text) for text in texts]
+
+
+def load_registered(registry, version):
+    meta = registry.get(version)
+    mmap_mode = 'r' if meta is not None and meta["mode"] in MMAP_MODES else None
+    return registry.load(version, mmap_mode=mmap_mode)
+
+
+def load_detector(mode=None, registry_root=None):
+    """Load the registry's active version, or the model saved at `mode`'s fixed path.
+
+    With mode=None the active version under registry_root (default
+    $MODEL_REGISTRY_DIR, else 'models') is used if there is one, and the
+    full model otherwise.
+    """
+    if mode is None:
+        registry_root = registry_root or os.environ.get('MODEL_REGISTRY_DIR', 'models')
+        # Checked first so that a missing registry is not created as a side effect
+        if os.path.exists(os.path.join(registry_root, STATE_NAME)):
+            registry = ModelRegistry(registry_root)
+            version = registry.active()
+            if version is not None:
+                return load_registered(registry, version)
+    detector = DETECTOR_CLASSES[mode or 'full']()
+    detector.load_model()
+    return detector
@@ -0,0 +1,69 @@
+import json
+import os
+import threading
+import time
+
+
+class FeedbackLog:
+    """Durable append-only log of labelled texts (one JSON object per line).
+
+    Every append is flushed and fsynced before returning. The byte offset up
+    to which records have been folded into the model is kept in a sidecar
+    file, so a restart resumes from the first unapplied record.
+    """
+
+    def __init__(self, path='data/feedback.jsonl'):
+        self.path = path
+        self.offset_path = path + '.offset'
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def append(self, records):
+        lines = ''.join(
+            json.dumps({"text": r["text"], "label": int(r["label"]), "ts": time.time()}) + '\n'
+            for r in records
+        )
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        return len(records)
+
+    def applied_offset(self):
+        try:
+            with open(self.offset_path) as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def mark_applied(self, offset):
+        tmp_path = self.offset_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.offset_path)
+
+    def read_pending(self, limit=None):
+        """Return (records, end_offset) for up to `limit` unapplied records"""
+        offset = self.applied_offset()
+        records = []
+        if not os.path.exists(self.path):
+            return records, offset
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            while limit is None or len(records) < limit:
+                line = f.readline()
+                # A line without its newline is a write still in progress
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                records.append(json.loads(line))
+        return records, offset
+
+    def pending_bytes(self):
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return size - self.applied_offset()
@@ -1,54 +1,63 @@
+import argparse
+import itertools
+import os
+import string
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import random
 
+from dataset_io import write_dataset
 
-def generate_large_fake_news_dataset(num_samples=5000):
-    print(f"🧠 Generating {num_samples} fake news samples...")
 
-    # SIMPLIFIED patterns - only use placeholders that we provide
-    fake_patterns = [
-        "BREAKING: {topic} discovered - {reaction}",
-        "SHOCKING: {topic} revealed - {reaction}",
-        "URGENT: {topic} happening now",
-        "Miracle {topic} cures {condition}",
-        "Secret {topic} exposed",
-        "Government hiding {topic}",
-        "Celebrity reveals {topic}",
-        "New law bans {topic}",
-        "Scientist proves {topic}",
-        "Ancient {topic} predicts {event}"
-    ]
+# SIMPLIFIED patterns - only use placeholders that we provide
+fake_patterns = [
+    "BREAKING: {topic} discovered - {reaction}",
+    "SHOCKING: {topic} revealed - {reaction}",
+    "URGENT: {topic} happening now",
+    "Miracle {topic} cures {condition}",
+    "Secret {topic} exposed",
+    "Government hiding {topic}",
+    "Celebrity reveals {topic}",
+    "New law bans {topic}",
+    "Scientist proves {topic}",
+    "Ancient {topic} predicts {event}"
+]
 
-    real_patterns = [
-        "Study shows {topic} improves {benefit}",
-        "Research confirms {topic} benefits {area}",
-        "Company announces {development}",
-        "City implements {program}",
-        "Local {organization} hosts event",
-        "New {facility} opens",
-        "Community organizes {activity}",
-        "School implements {program}",
-        "Research demonstrates {finding}",
-        "Public {service} expands"
-    ]
+real_patterns = [
+    "Study shows {topic} improves {benefit}",
+    "Research confirms {topic} benefits {area}",
+    "Company announces {development}",
+    "City implements {program}",
+    "Local {organization} hosts event",
+    "New {facility} opens",
+    "Community organizes {activity}",
+    "School implements {program}",
+    "Research demonstrates {finding}",
+    "Public {service} expands"
+]
 
-    # Vocabulary - SIMPLIFIED
-    fake_topics = ["alien technology", "time travel", "free energy", "mind control", "secret society", "miracle cure",
-                   "government conspiracy"]
-    real_topics = ["education reform", "healthcare access", "environmental protection", "economic growth",
-                   "technology innovation"]
-    reactions = ["doctors amazed", "scientists stunned", "experts shocked"]
-    conditions = ["cancer", "diabetes", "obesity", "heart disease"]
-    events = ["world war 3", "alien invasion", "economic collapse", "natural disaster"]
-    benefits = ["health", "education", "safety", "environment"]
-    areas = ["urban areas", "rural communities", "school districts"]
-    developments = ["new technology", "expanded services", "improved facilities"]
-    programs = ["literacy program", "health initiative", "safety campaign"]
-    organizations = ["school", "hospital", "business", "nonprofit"]
-    facilities = ["library", "community center", "park", "sports complex"]
-    activities = ["cleanup", "fundraiser", "educational program"]
-    findings = ["positive results", "significant improvement", "notable progress"]
-    services = ["healthcare", "education", "transportation", "safety"]
+# Vocabulary - SIMPLIFIED
+fake_topics = ["alien technology", "time travel", "free energy", "mind control", "secret society", "miracle cure",
+               "government conspiracy"]
+real_topics = ["education reform", "healthcare access", "environmental protection", "economic growth",
+               "technology innovation"]
+reactions = ["doctors amazed", "scientists stunned", "experts shocked"]
+conditions = ["cancer", "diabetes", "obesity", "heart disease"]
+events = ["world war 3", "alien invasion", "economic collapse", "natural disaster"]
+benefits = ["health", "education", "safety", "environment"]
+areas = ["urban areas", "rural communities", "school districts"]
+developments = ["new technology", "expanded services", "improved facilities"]
+programs = ["literacy program", "health initiative", "safety campaign"]
+organizations = ["school", "hospital", "business", "nonprofit"]
+facilities = ["library", "community center", "park", "sports complex"]
+activities = ["cleanup", "fundraiser", "educational program"]
+findings = ["positive results", "significant improvement", "notable progress"]
+services = ["healthcare", "education", "transportation", "safety"]
+
+
+def generate_large_fake_news_dataset(num_samples=5000):
+    print(f"🧠 Generating {num_samples} fake news samples...")
 
     samples = []
 
@@ -162,11 +171,127 @@ def generate_large_fake_news_dataset(num_samples=5000):
     return df
 
 
+# Slot values for each label, looked up by placeholder name
+fake_slots = {
+    "topic": fake_topics,
+    "reaction": reactions,
+    "condition": conditions,
+    "event": events
+}
+
+real_slots = {
+    "topic": real_topics,
+    "benefit": benefits,
+    "area": areas,
+    "development": developments,
+    "program": programs,
+    "organization": organizations,
+    "facility": facilities,
+    "activity": activities,
+    "finding": findings,
+    "service": services
+}
+
+
+def compile_templates(patterns, slots):
+    """Render every slot combination of every pattern up front.
+
+    Returns a flat array of strings plus each pattern's offset and count in
+    it, so a sample is drawn with two integer lookups instead of formatting.
+    """
+    import numpy as np
+
+    rendered, offsets, counts = [], [], []
+    for pattern in patterns:
+        names = [name for _, name, _, _ in string.Formatter().parse(pattern) if name]
+        texts = [
+            pattern.format(**dict(zip(names, values)))
+            for values in itertools.product(*(slots[name] for name in names))
+        ]
+        offsets.append(len(rendered))
+        counts.append(len(texts))
+        rendered.extend(texts)
+    return np.array(rendered, dtype=object), np.array(offsets), np.array(counts)
+
+
+def generate_fast_dataset(num_samples, seed=None):
+    """Vectorized equivalent of generate_large_fake_news_dataset's sampling.
+
+    Picks the label, pattern and slot combination for every row at once with
+    NumPy; each pattern and each of its combinations is equally likely, as in
+    the original. The hand-written quality examples are not added.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    labels = (rng.random(num_samples) > 0.5).astype(np.int8)
+    texts = np.empty(num_samples, dtype=object)
+
+    for label, patterns, slots in ((1, fake_patterns, fake_slots), (0, real_patterns, real_slots)):
+        rows = np.flatnonzero(labels == label)
+        rendered, offsets, counts = compile_templates(patterns, slots)
+        pattern_index = rng.integers(len(patterns), size=len(rows))
+        combo_index = (rng.random(len(rows)) * counts[pattern_index]).astype(np.int64)
+        texts[rows] = rendered[offsets[pattern_index] + combo_index]
+
+    return pd.DataFrame({'text': texts, 'label': labels})
+
+
+def write_shard(shard_index, num_shards, num_samples, seed, output_dir, fmt):
+    df = generate_fast_dataset(num_samples, seed)
+    path = os.path.join(output_dir, f"fake_news_{shard_index:05d}-of-{num_shards:05d}.{fmt}")
+    write_dataset(df, path)
+    return path, len(df)
+
+
+def generate_sharded_dataset(num_rows, num_shards=1, output_dir='generated', fmt='csv', seed=0, workers=None):
+    """Generate num_rows samples into num_shards files using a process pool.
+
+    Each shard gets its own seed spawned from `seed`, so the output is the
+    same regardless of how many workers produced it.
+    """
+    import numpy as np
+
+    os.makedirs(output_dir, exist_ok=True)
+    shard_seeds = np.random.SeedSequence(seed).spawn(num_shards)
+    sizes = [num_rows // num_shards + (1 if i < num_rows % num_shards else 0) for i in range(num_shards)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(write_shard, i, num_shards, sizes[i], shard_seeds[i], output_dir, fmt)
+            for i in range(num_shards)
+        ]
+        return [future.result() for future in futures]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic fake news dataset")
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--shards', type=int,
+                        help="write a sharded dataset with the fast generator instead of one CSV")
+    parser.add_argument('--format', choices=['csv', 'parquet', 'arrow'], default='csv')
+    parser.add_argument('--output-dir', default='generated')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per core)")
+    return parser.parse_args(argv)
+
+
 # Generate and save the dataset
 if __name__ == "__main__":
-    dataset = generate_large_fake_news_dataset(5000)
-    dataset.to_csv('large_fake_news_dataset.csv', index=False)
-    print("💾 Saved as 'large_fake_news_dataset.csv'")
+    args = parse_args()
+
+    if args.shards:
+        print(f"🧠 Generating {args.rows} samples into {args.shards} {args.format} shards...")
+        shards = generate_sharded_dataset(args.rows, args.shards, args.output_dir, args.format,
+                                          args.seed, args.workers)
+        for path, rows in shards:
+            print(f"💾 Saved {rows} samples as '{path}'")
+        raise SystemExit(0)
+
+    dataset = generate_large_fake_news_dataset(args.rows)
+    output_path = f'large_fake_news_dataset.{args.format}'
+    write_dataset(dataset, output_path)
+    print(f"💾 Saved as '{output_path}'")
 
     # Show samples
     print("\n🔍 Sample from generated dataset:")
@@ -0,0 +1,185 @@
+"""Low-overhead in-process metrics with Prometheus text export.
+
+Every thread records into its own shard, so the hot path never takes a lock;
+shards are only merged when /metrics or /stats is scraped. Shards of threads
+that have exited are folded into a retired total so per-request server
+threads do not leak.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Fold dead thread shards when this many are registered, even without a scrape
+MAX_LIVE_SHARDS = 64
+
+
+class _Shard:
+    def __init__(self):
+        self.counters = {}
+        # (name, labels) -> [bucket counts..., +Inf count], sum, count
+        self.histograms = {}
+        self.buckets = {}
+
+    def merge_into(self, other):
+        for key, value in self.counters.copy().items():
+            other.counters[key] = other.counters.get(key, 0) + value
+        for key, (counts, total, count) in self.histograms.copy().items():
+            other.buckets.setdefault(key, self.buckets[key])
+            merged = other.histograms.get(key)
+            if merged is None:
+                other.histograms[key] = [list(counts), total, count]
+            else:
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+                merged[2] += count
+
+
+class MetricsRegistry:
+    def __init__(self, prefix='fakenews'):
+        self.prefix = prefix
+        self._local = threading.local()
+        self._shards = []
+        self._retired = _Shard()
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                if len(self._shards) >= MAX_LIVE_SHARDS:
+                    self._fold_dead_shards()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _fold_dead_shards(self):
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                shard.merge_into(self._retired)
+        self._shards = live
+
+    def inc(self, name, labels=(), value=1):
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=(), buckets=LATENCY_BUCKETS):
+        shard = self._shard()
+        key = (name, labels)
+        histogram = shard.histograms.get(key)
+        if histogram is None:
+            histogram = shard.histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            shard.buckets[key] = buckets
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(buckets)
+        histogram[0][i] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+    @contextmanager
+    def timer(self, name, labels=()):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, labels)
+
+    def snapshot(self):
+        """Merge all shards into one"""
+        merged = _Shard()
+        with self._lock:
+            self._fold_dead_shards()
+            self._retired.merge_into(merged)
+            for _, shard in self._shards:
+                shard.merge_into(merged)
+        return merged
+
+    def summary(self):
+        """Counters and histogram quantiles as plain dicts for JSON responses"""
+        merged = self.snapshot()
+        counters = {}
+        for (name, labels), value in sorted(merged.counters.items()):
+            counters.setdefault(name, {})[_label_text(labels) or "total"] = value
+        histograms = {}
+        for (name, labels), (counts, total, count) in sorted(merged.histograms.items()):
+            entry = {"count": count, "mean": total / count if count else 0.0}
+            for q in QUANTILES:
+                entry[f"p{int(q * 100)}"] = _quantile(merged.buckets[(name, labels)], counts, count, q)
+            histograms.setdefault(name, {})[_label_text(labels) or "total"] = entry
+        return {"counters": counters, "histograms": histograms}
+
+    def render_prometheus(self):
+        merged = self.snapshot()
+        lines = []
+        seen = set()
+
+        for (name, labels), value in sorted(merged.counters.items()):
+            full = f"{self.prefix}_{name}"
+            if full not in seen:
+                seen.add(full)
+                lines.append(f"# TYPE {full} counter")
+            lines.append(f"{full}{_labels(labels)} {value}")
+
+        for (name, labels), (counts, total, count) in sorted(merged.histograms.items()):
+            full = f"{self.prefix}_{name}"
+            if full not in seen:
+                seen.add(full)
+                lines.append(f"# TYPE {full} histogram")
+            buckets = merged.buckets[(name, labels)]
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{full}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{full}_sum{_labels(labels)} {total}")
+            lines.append(f"{full}_count{_labels(labels)} {count}")
+
+        for (name, labels), (counts, total, count) in sorted(merged.histograms.items()):
+            full = f"{self.prefix}_{name}_quantile"
+            if full not in seen:
+                seen.add(full)
+                lines.append(f"# TYPE {full} gauge")
+            for q in QUANTILES:
+                value = _quantile(merged.buckets[(name, labels)], counts, count, q)
+                lines.append(f"{full}{_labels(labels + (('quantile', str(q)),))} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _quantile(buckets, counts, count, q):
+    """Upper bound of the bucket holding the q-th observation"""
+    if not count:
+        return 0.0
+    rank = q * count
+    cumulative = 0
+    for bound, bucket_count in zip(buckets, counts):
+        cumulative += bucket_count
+        if cumulative >= rank:
+            return bound
+    return float(buckets[-1])
+
+
+def _label_text(labels):
+    return ",".join(f"{k}={v}" for k, v in labels)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"') for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+registry = MetricsRegistry()
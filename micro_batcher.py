@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from queue import Empty, Queue
+
+# Upper bounds of the histogram buckets for batch size and queue depth
+HISTOGRAM_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+def _bucket(value):
+    for bound in HISTOGRAM_BUCKETS:
+        if value <= bound:
+            return str(bound)
+    return "+Inf"
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-text requests into one batched model call.
+
+    Callers block on the Future returned by submit(). A background thread
+    waits up to max_wait_ms after the first queued text, or until max_batch
+    texts are queued, then scores them together with score_fn(texts) and
+    fans the results back out.
+
+    The thread is started on the first submit() and again in a forked child
+    (threads do not survive fork(), and serve.py imports the app before
+    forking its workers). predict() gives up after `timeout` seconds.
+    """
+
+    def __init__(self, score_fn, max_wait_ms=5, max_batch=64, timeout=30.0):
+        self.score_fn = score_fn
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.batches = 0
+        self.items = 0
+        self.batch_size_histogram = {}
+        self.queue_depth_histogram = {}
+        self._queue = Queue()
+        self._stats_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._pid = None
+
+    def _ensure_running(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked: the inherited queue and lock belong to a thread that no longer exists
+                self._queue = Queue()
+                self._stats_lock = threading.Lock()
+            threading.Thread(target=self._run, args=(self._queue,), name="micro-batcher", daemon=True).start()
+            self._pid = os.getpid()
+
+    def submit(self, text):
+        self._ensure_running()
+        future = Future()
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            key = _bucket(depth + 1)
+            self.queue_depth_histogram[key] = self.queue_depth_histogram.get(key, 0) + 1
+        self._queue.put((text, future))
+        return future
+
+    def predict(self, text):
+        future = self.submit(text)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise TimeoutError(f"Micro-batcher gave no result within {self.timeout:g}s") from None
+
+    def _collect(self, queue):
+        batch = [queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(queue.get(timeout=remaining))
+            except Empty:
+                break
+        return batch
+
+    def _run(self, queue):
+        while True:
+            batch = self._collect(queue)
+            texts = [text for text, _ in batch]
+            try:
+                results = self.score_fn(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+
+            with self._stats_lock:
+                self.batches += 1
+                self.items += len(batch)
+                key = _bucket(len(batch))
+                self.batch_size_histogram[key] = self.batch_size_histogram.get(key, 0) + 1
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "enabled": True,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "max_batch": self.max_batch,
+                "queue_depth": self._queue.qsize(),
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+                "batch_size_histogram": dict(self.batch_size_histogram),
+                "queue_depth_histogram": dict(self.queue_depth_histogram)
+            }
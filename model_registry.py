@@ -0,0 +1,234 @@
+"""Versioned on-disk registry of trained detectors.
+
+Each version is a directory under <root>/versions holding the pickled
+detector and a meta.json with its SHA-256 content hash, accuracy, training
+duration and training metadata. Versions are staged in a temporary
+directory and renamed into place, and the active pointer is replaced
+atomically, so readers never see a partially written model.
+
+    python model_registry.py list
+    python model_registry.py register --mode compact
+    python model_registry.py activate 20260101-120000-1a2b3c4d
+    python model_registry.py rollback
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+ARTIFACT_NAME = 'detector.joblib'
+META_NAME = 'meta.json'
+STATE_NAME = 'registry.json'
+
+
+class RegistryError(Exception):
+    pass
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_json_atomic(path, payload):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ModelRegistry:
+    """Stores every trained detector as an immutable version.
+
+    The active version and the activation history live in registry.json;
+    rollback() re-activates the version that was active before the current
+    one. Registering and activating are separate steps, so training workers
+    can register from another process while the server decides what to serve.
+    """
+
+    def __init__(self, root='models'):
+        self.root = root
+        self.versions_dir = os.path.join(root, 'versions')
+        self.state_path = os.path.join(root, STATE_NAME)
+        self._lock = threading.Lock()
+        os.makedirs(self.versions_dir, exist_ok=True)
+
+    def _state(self):
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"active": None, "history": []}
+
+    def _meta_path(self, version):
+        return os.path.join(self.versions_dir, version, META_NAME)
+
+    def register(self, detector, mode, accuracy=None, train_seconds=None, metadata=None):
+        """Persist detector as a new version and return its metadata"""
+        import joblib
+
+        staging = os.path.join(self.root, f".staging-{uuid.uuid4().hex}")
+        os.makedirs(staging)
+        try:
+            artifact_path = os.path.join(staging, ARTIFACT_NAME)
+            joblib.dump(detector, artifact_path)
+            with open(artifact_path, 'rb') as f:
+                os.fsync(f.fileno())
+            sha256 = file_sha256(artifact_path)
+
+            created_at = time.time()
+            version = f"{time.strftime('%Y%m%d-%H%M%S', time.gmtime(created_at))}-{sha256[:8]}"
+            meta = {
+                "version": version,
+                "mode": mode,
+                "detector_class": type(detector).__name__,
+                "sha256": sha256,
+                "size_bytes": os.path.getsize(artifact_path),
+                "accuracy": accuracy,
+                "train_seconds": train_seconds,
+                "created_at": created_at,
+                "metadata": metadata or {}
+            }
+            _write_json_atomic(os.path.join(staging, META_NAME), meta)
+            target = os.path.join(self.versions_dir, version)
+            if os.path.exists(target):
+                # Same bytes registered within the same second
+                shutil.rmtree(staging)
+                return self.get(version)
+            os.rename(staging, target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return meta
+
+    def get(self, version):
+        try:
+            with open(self._meta_path(version)) as f:
+                return json.load(f)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+    def list(self):
+        """All versions, newest first, each marked with whether it is active"""
+        active = self.active()
+        versions = []
+        for name in os.listdir(self.versions_dir):
+            meta = self.get(name)
+            if meta is not None:
+                meta["active"] = name == active
+                versions.append(meta)
+        versions.sort(key=lambda meta: meta["created_at"], reverse=True)
+        return versions
+
+    def active(self):
+        return self._state()["active"]
+
+    def load(self, version, mmap_mode=None):
+        """Load a version's detector after checking its content hash; mmap_mode
+        is passed to joblib.load"""
+        import joblib
+
+        meta = self.get(version)
+        if meta is None:
+            raise RegistryError(f"Unknown model version: {version}")
+        artifact_path = os.path.join(self.versions_dir, version, ARTIFACT_NAME)
+        if file_sha256(artifact_path) != meta["sha256"]:
+            raise RegistryError(f"Model version {version} failed its content hash check")
+        return joblib.load(artifact_path, mmap_mode=mmap_mode)
+
+    def activate(self, version):
+        """Point the registry at version; returns the previously active version"""
+        if self.get(version) is None:
+            raise RegistryError(f"Unknown model version: {version}")
+        with self._lock:
+            state = self._state()
+            previous = state["active"]
+            if previous != version:
+                state["history"].append(version)
+            state["active"] = version
+            _write_json_atomic(self.state_path, state)
+            return previous
+
+    def previous(self):
+        """The version rollback() would activate, or None"""
+        history = self._state()["history"]
+        return history[-2] if len(history) >= 2 else None
+
+    def rollback(self):
+        """Re-activate the version that was active before the current one"""
+        with self._lock:
+            state = self._state()
+            if len(state["history"]) < 2:
+                raise RegistryError("No earlier version to roll back to")
+            state["history"].pop()
+            state["active"] = state["history"][-1]
+            _write_json_atomic(self.state_path, state)
+            return state["active"]
+
+
+def register_trained(registry_root, detector, result, data_path, params=None):
+    """Register a freshly trained detector and add its version to the training result"""
+    if registry_root is None:
+        return result
+    stat = os.stat(data_path)
+    metadata = {
+        "data_path": data_path,
+        "data_bytes": stat.st_size,
+        "data_mtime": stat.st_mtime,
+        "params": params or {}
+    }
+    meta = ModelRegistry(registry_root).register(
+        detector, result["mode"], result.get("accuracy"), result.get("train_seconds"), metadata
+    )
+    return dict(result, version=meta["version"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Versioned model registry")
+    parser.add_argument('--root', default=os.environ.get('MODEL_REGISTRY_DIR', 'models'))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('list')
+    register = subparsers.add_parser('register', help="register the model saved at the fixed path")
+    register.add_argument('--mode', default='full')
+    register.add_argument('--activate', action='store_true')
+    activate = subparsers.add_parser('activate')
+    activate.add_argument('version')
+    subparsers.add_parser('rollback')
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.root)
+    if args.command == 'list':
+        print(f"{'':1} {'version':<26} {'mode':<10} {'accuracy':>9} {'train s':>8} {'size':>10}  sha256")
+        for meta in registry.list():
+            accuracy = f"{meta['accuracy']:.4f}" if meta['accuracy'] is not None else '-'
+            train_seconds = f"{meta['train_seconds']:.1f}" if meta['train_seconds'] is not None else '-'
+            print(f"{'*' if meta['active'] else '':1} {meta['version']:<26} {meta['mode']:<10} {accuracy:>9} "
+                  f"{train_seconds:>8} {meta['size_bytes'] / 1024:>6.0f} KiB  {meta['sha256'][:16]}")
+    elif args.command == 'register':
+        from detectors import DETECTOR_CLASSES
+
+        detector = DETECTOR_CLASSES[args.mode]()
+        detector.load_model()
+        meta = registry.register(detector, args.mode)
+        print(f"💾 Registered {args.mode} model as version {meta['version']}")
+        if args.activate:
+            registry.activate(meta['version'])
+            print(f"✅ Activated {meta['version']}")
+    elif args.command == 'activate':
+        registry.activate(args.version)
+        print(f"✅ Activated {args.version}")
+    else:
+        print(f"⏪ Rolled back to {registry.rollback()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""Parallel k-fold cross-validation and grid search for the TF-IDF + Logistic
+Regression model behind FakeNewsDetector.
+
+Work is split into one task per (fold, n-gram range): each task fits the
+TF-IDF vocabulary for its fold once and reuses the transformed matrices for
+every regularization strength C. Tasks run across cores in a process pool.
+
+    python model_search.py data/fake_news_data.csv --folds 5 --C 0.1 1 10 --ngrams 1,1 1,2
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dataset_io import read_dataset
+from model_registry import register_trained
+
+DEFAULT_C_VALUES = (0.1, 1.0, 10.0)
+DEFAULT_NGRAM_RANGES = ((1, 1), (1, 2))
+# Rows fit_best predicts through the detector to check the refit pair is used
+CHECK_ROWS = 5
+
+# Set in each worker by _init_worker so the corpus is not pickled per task
+_texts = None
+_labels = None
+
+
+def load_corpus(data_path):
+    df = read_dataset(data_path, columns=['text', 'label']).dropna()
+    return df['text'].astype(str).to_numpy(dtype=object), df['label'].astype(int).to_numpy()
+
+
+def _init_worker(data_path):
+    global _texts, _labels
+    _texts, _labels = load_corpus(data_path)
+
+
+def evaluate_fold(fold, train_index, test_index, ngram_range, c_values):
+    """Fit TF-IDF once for this fold and score every C on it"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    started = time.perf_counter()
+    vectorizer = TfidfVectorizer(ngram_range=ngram_range)
+    X_train = vectorizer.fit_transform(_texts[train_index])
+    X_test = vectorizer.transform(_texts[test_index])
+    vectorize_seconds = time.perf_counter() - started
+
+    scores = []
+    for c in c_values:
+        started = time.perf_counter()
+        model = LogisticRegression(C=c, max_iter=1000)
+        model.fit(X_train, _labels[train_index])
+        accuracy = float(model.score(X_test, _labels[test_index]))
+        scores.append({
+            "fold": fold,
+            "ngram_range": list(ngram_range),
+            "C": c,
+            "accuracy": accuracy,
+            "fit_seconds": time.perf_counter() - started,
+            "vectorize_seconds": vectorize_seconds
+        })
+    return scores
+
+
+def grid_search(data_path, c_values=DEFAULT_C_VALUES, ngram_ranges=DEFAULT_NGRAM_RANGES,
+                folds=5, workers=None, seed=42):
+    """Return the leaderboard, best parameter set first"""
+    from sklearn.model_selection import StratifiedKFold
+
+    texts, labels = load_corpus(data_path)
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed).split(texts, labels))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_path,)) as pool:
+        futures = [
+            pool.submit(evaluate_fold, fold, train_index, test_index, tuple(ngram_range), list(c_values))
+            for fold, (train_index, test_index) in enumerate(splits)
+            for ngram_range in ngram_ranges
+        ]
+        fold_scores = [score for future in futures for score in future.result()]
+
+    grouped = {}
+    for score in fold_scores:
+        grouped.setdefault((tuple(score["ngram_range"]), score["C"]), []).append(score)
+
+    leaderboard = []
+    for (ngram_range, c), scores in grouped.items():
+        accuracies = np.array([s["accuracy"] for s in scores])
+        leaderboard.append({
+            "ngram_range": list(ngram_range),
+            "C": c,
+            "mean_accuracy": float(accuracies.mean()),
+            "std_accuracy": float(accuracies.std()),
+            "mean_fit_seconds": float(np.mean([s["fit_seconds"] for s in scores])),
+            "mean_vectorize_seconds": float(np.mean([s["vectorize_seconds"] for s in scores])),
+            "folds": len(scores)
+        })
+    leaderboard.sort(key=lambda row: (-row["mean_accuracy"], row["std_accuracy"], row["mean_fit_seconds"]))
+    return leaderboard
+
+
+def fit_best(data_path, best):
+    """Refit the winning parameters on the whole corpus as a FakeNewsDetector.
+
+    FakeNewsDetector keeps its TF-IDF step in `vectorizer` and its classifier
+    in `model` (see compact_model.export_detector); the refit pair is placed
+    there and persisted with save_model(), after checking that the detector's
+    predict() gives the same answers as the pair on a few rows.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    from model import FakeNewsDetector
+
+    texts, labels = load_corpus(data_path)
+    vectorizer = TfidfVectorizer(ngram_range=tuple(best["ngram_range"]))
+    model = LogisticRegression(C=best["C"], max_iter=1000)
+    model.fit(vectorizer.fit_transform(texts), labels)
+
+    detector = FakeNewsDetector()
+    detector.vectorizer = vectorizer
+    detector.model = model
+    detector.is_trained = True
+    check_detector(detector, vectorizer, model, texts[:CHECK_ROWS])
+    detector.save_model()
+    return detector
+
+
+def check_detector(detector, vectorizer, model, texts, tolerance=1e-6):
+    """Raise if detector.predict() disagrees with vectorizer + model on texts"""
+    expected = model.predict_proba(vectorizer.transform(texts))[:, 1]
+    for text, p in zip(texts, expected):
+        result = detector.predict(text)
+        if "fake_probability" in result:
+            actual = result["fake_probability"]
+        else:
+            actual = result["confidence"] if result["label"] == "FAKE" else 1 - result["confidence"]
+        if result["label"] != ("FAKE" if p >= 0.5 else "REAL") or abs(actual - p) > tolerance:
+            raise RuntimeError(
+                f"FakeNewsDetector does not use the refit vectorizer/model: predicted {result} "
+                f"where the model gives a fake probability of {p:.4f}"
+            )
+
+
+def search_and_save(data_path, c_values=DEFAULT_C_VALUES, ngram_ranges=DEFAULT_NGRAM_RANGES,
+                    folds=5, workers=None, registry_root=None):
+    started = time.perf_counter()
+    leaderboard = grid_search(data_path, c_values, ngram_ranges, folds, workers)
+    detector = fit_best(data_path, leaderboard[0])
+    result = {
+        "mode": "full",
+        "accuracy": leaderboard[0]["mean_accuracy"],
+        "best_params": {"C": leaderboard[0]["C"], "ngram_range": leaderboard[0]["ngram_range"]},
+        "leaderboard": leaderboard,
+        "train_seconds": time.perf_counter() - started
+    }
+    return register_trained(registry_root, detector, result, data_path,
+                            {"best_params": result["best_params"], "folds": folds})
+
+
+def parse_ngram_range(value):
+    low, high = (int(part) for part in value.split(','))
+    return low, high
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cross-validated grid search for FakeNewsDetector")
+    parser.add_argument('data_path', nargs='?', default='data/fake_news_data.csv')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--C', type=float, nargs='+', default=list(DEFAULT_C_VALUES))
+    parser.add_argument('--ngrams', type=parse_ngram_range, nargs='+', default=list(DEFAULT_NGRAM_RANGES),
+                        help="n-gram ranges as low,high")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--no-save', action='store_true', help="only print the leaderboard")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    leaderboard = grid_search(args.data_path, args.C, args.ngrams, args.folds, args.workers)
+    print(f"🏁 {len(leaderboard)} parameter sets x {args.folds} folds in {time.perf_counter() - started:.2f}s\n")
+    print(f"{'rank':>4} {'ngrams':>8} {'C':>8} {'accuracy':>10} {'std':>8} {'fit s':>8} {'tfidf s':>8}")
+    for rank, row in enumerate(leaderboard, start=1):
+        ngrams = f"{row['ngram_range'][0]},{row['ngram_range'][1]}"
+        print(f"{rank:>4} {ngrams:>8} {row['C']:>8g} {row['mean_accuracy']:>10.4f} {row['std_accuracy']:>8.4f} "
+              f"{row['mean_fit_seconds']:>8.3f} {row['mean_vectorize_seconds']:>8.3f}")
+
+    if not args.no_save:
+        fit_best(args.data_path, leaderboard[0])
+        print("\n💾 Best model saved with FakeNewsDetector.save_model()")
+
+
+if __name__ == '__main__':
+    main()
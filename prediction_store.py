@@ -0,0 +1,183 @@
+"""Persistent prediction store for repeated bulk scoring.
+
+Predictions are kept in SQLite keyed by (model id, hash of normalized text),
+so re-scoring the same articles under the same model is a lookup instead of
+a model call, across restarts.
+
+    python prediction_store.py score articles.csv --mode full
+    python bulk_score.py articles.csv scores.jsonl --store data/predictions.sqlite
+
+The first fills the store only; bulk_score.py --store writes every row's
+prediction and only runs the model for texts the store does not have.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+from detectors import DETECTOR_CLASSES, load_detector, predict_many
+from prediction_cache import normalize_text
+
+# Fixed inputs whose predictions identify a model (see model_fingerprint)
+PROBE_TEXTS = (
+    "BREAKING: alien technology discovered - scientists stunned",
+    "Miracle free energy cures diabetes",
+    "Government hiding time travel",
+    "Study shows education reform improves health",
+    "City implements literacy program",
+    "Stock market reaches all-time high amid economic recovery",
+    "Vaccines contain microchips for population tracking, documents reveal",
+    "Local community raises funds for new public library",
+    "",
+    "the"
+)
+
+# SQLite limits the number of bound parameters per statement
+LOOKUP_BATCH = 500
+
+
+def text_hash(text):
+    return hashlib.blake2b(normalize_text(text).encode('utf-8'), digest_size=16).digest()
+
+
+def model_fingerprint(detector):
+    """Identify a model by its predictions on PROBE_TEXTS.
+
+    This works for any detector regardless of how it is persisted; two
+    different models agreeing on every probe probability is practically
+    impossible. Returns None for an untrained detector.
+    """
+    try:
+        predictions = [detector.predict(text) for text in PROBE_TEXTS]
+    except Exception:
+        return None
+    payload = json.dumps([type(detector).__name__, predictions], sort_keys=True)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class PredictionStore:
+    def __init__(self, path='data/predictions.sqlite'):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Not kept open: app.py builds the store at import and serve.py forks
+        # afterwards, and a SQLite connection must not be used across fork()
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS predictions (
+                    model_id TEXT NOT NULL,
+                    text_hash BLOB NOT NULL,
+                    result TEXT NOT NULL,
+                    PRIMARY KEY (model_id, text_hash)
+                ) WITHOUT ROWID
+            """)
+
+    def _connection(self):
+        # One connection per thread and process; WAL lets readers run during writes
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get_many(self, model_id, hashes):
+        """Return {hash: prediction} for the hashes already scored under model_id"""
+        conn = self._connection()
+        found = {}
+        unique = list(set(hashes))
+        for start in range(0, len(unique), LOOKUP_BATCH):
+            batch = unique[start:start + LOOKUP_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            rows = conn.execute(
+                f"SELECT text_hash, result FROM predictions WHERE model_id = ? AND text_hash IN ({placeholders})",
+                [model_id, *batch]
+            )
+            for digest, result in rows:
+                found[bytes(digest)] = json.loads(result)
+        return found
+
+    def put_many(self, model_id, items):
+        """Store (hash, prediction) pairs in one transaction"""
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO predictions (model_id, text_hash, result) VALUES (?, ?, ?)",
+                [(model_id, digest, json.dumps(result)) for digest, result in items]
+            )
+
+    def count(self, model_id=None):
+        conn = self._connection()
+        if model_id is None:
+            return conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+        return conn.execute("SELECT COUNT(*) FROM predictions WHERE model_id = ?", (model_id,)).fetchone()[0]
+
+
+def score_with_store(detector, store, model_id, texts):
+    """Predictions for texts, running the model only on texts not yet stored
+    under model_id.
+
+    Returns (results, distinct texts newly scored, rows answered from the store).
+    """
+    hashes = [text_hash(text) for text in texts]
+    known = store.get_many(model_id, hashes)
+
+    pending = {}
+    for digest, text in zip(hashes, texts):
+        if digest not in known:
+            pending.setdefault(digest, text)
+    if pending:
+        results = predict_many(detector, list(pending.values()))
+        store.put_many(model_id, zip(pending.keys(), results))
+        known.update(zip(pending.keys(), results))
+    stored = sum(1 for digest in hashes if digest not in pending)
+    return [known[digest] for digest in hashes], len(pending), stored
+
+
+def score_file(path, detector, store, chunksize=10000):
+    """Score every text in a dataset file, skipping those already stored for this model"""
+    from dataset_io import iter_dataset_chunks
+
+    model_id = model_fingerprint(detector)
+    if model_id is None:
+        raise ValueError("Detector is not trained")
+
+    stats = {"model_id": model_id, "rows": 0, "stored": 0, "scored": 0}
+    started = time.perf_counter()
+    for chunk in iter_dataset_chunks(path, columns=['text'], chunksize=chunksize):
+        texts = chunk['text'].fillna('').astype(str).tolist()
+        _, scored, stored = score_with_store(detector, store, model_id, texts)
+
+        stats["rows"] += len(texts)
+        stats["scored"] += scored
+        stats["stored"] += stored
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Persistent prediction store for bulk scoring")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    score = subparsers.add_parser('score', help="score a file, skipping rows already in the store")
+    score.add_argument('path')
+    score.add_argument('--mode', choices=sorted(DETECTOR_CLASSES),
+                       help="fixed-path model to use (default: the active registry version, else full)")
+    score.add_argument('--store', default='data/predictions.sqlite')
+    score.add_argument('--chunksize', type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    detector = load_detector(args.mode)
+    stats = score_file(args.path, detector, PredictionStore(args.store), args.chunksize)
+    print(f"✅ Scored '{args.path}' under model {stats['model_id']} in {stats['seconds']:.2f}s")
+    print(f"   📈 Rows: {stats['rows']} ({stats['rows'] / max(stats['seconds'], 1e-9):.0f} rows/s)")
+    print(f"   💾 From store: {stats['stored']}, newly scored texts: {stats['scored']}")
+
+
+if __name__ == '__main__':
+    main()
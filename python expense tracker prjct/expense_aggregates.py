@@ -0,0 +1,105 @@
+"""Running per-category aggregates (total, count, min, max) for expenses.
+
+add() and remove() are O(1). Removing a category's current minimum or
+maximum only marks that bound stale; it is recomputed the next time the
+summary is read from a per-category count of each distinct amount, so the
+cost depends on the distinct amounts in that category, not on the number of
+expenses. Aggregates loaded from a snapshot have no amount counts; they are
+built by one pass over the expenses the first time a bound goes stale.
+"""
+import math
+from collections import Counter
+
+def recompute(expenses):
+    aggregates = CategoryAggregates()
+    for exp in expenses:
+        aggregates.add(exp["amount"], exp["category"])
+    return aggregates
+
+class CategoryAggregates:
+    def __init__(self, stats=None):
+        # category -> [total, count, min, max], in first-seen order
+        self.stats = stats or {}
+        self._stale = set()
+        # category -> Counter of amounts; None until built when aggregates
+        # start from existing stats
+        self._amounts = {} if stats is None else None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls({category: [s["total"], s["count"], s["min"], s["max"]] for category, s in data.items()})
+
+    def copy(self):
+        aggregates = CategoryAggregates({category: list(s) for category, s in self.stats.items()})
+        aggregates._stale = set(self._stale)
+        if self._amounts is not None:
+            aggregates._amounts = {category: Counter(c) for category, c in self._amounts.items()}
+        return aggregates
+
+    def add(self, amount, category):
+        if self._amounts is not None:
+            self._amounts.setdefault(category, Counter())[amount] += 1
+        s = self.stats.get(category)
+        if s is None:
+            self.stats[category] = [amount, 1, amount, amount]
+            return
+        s[0] += amount
+        s[1] += 1
+        if category not in self._stale:
+            s[2] = min(s[2], amount)
+            s[3] = max(s[3], amount)
+
+    def remove(self, amount, category):
+        s = self.stats[category]
+        if s[1] == 1:
+            del self.stats[category]
+            self._stale.discard(category)
+            if self._amounts is not None:
+                self._amounts.pop(category, None)
+            return
+        if self._amounts is not None:
+            amounts = self._amounts[category]
+            amounts[amount] -= 1
+            if not amounts[amount]:
+                del amounts[amount]
+        s[0] -= amount
+        s[1] -= 1
+        if amount <= s[2] or amount >= s[3]:
+            self._stale.add(category)
+
+    def refresh(self, expenses):
+        """Recompute min/max for stale categories from their amount counts.
+
+        expenses is only read (once) if the counts have not been built yet.
+        """
+        if not self._stale:
+            return
+        if self._amounts is None:
+            self._amounts = {}
+            for exp in expenses:
+                self._amounts.setdefault(exp["category"], Counter())[exp["amount"]] += 1
+        for category in self._stale:
+            amounts = self._amounts[category]
+            self.stats[category][2:] = [min(amounts), max(amounts)]
+        self._stale.clear()
+
+    def summary(self, expenses):
+        self.refresh(expenses)
+        return self.to_dict()
+
+    def to_dict(self):
+        return {
+            category: {"total": s[0], "count": s[1], "min": s[2], "max": s[3]}
+            for category, s in self.stats.items()
+        }
+
+    def mismatches(self, expected):
+        """Categories whose aggregates differ from `expected` (a full recompute)"""
+        ours, theirs = self.to_dict(), expected.to_dict()
+        bad = []
+        for category in set(ours) | set(theirs):
+            a, b = ours.get(category), theirs.get(category)
+            if a is None or b is None or a["count"] != b["count"] or not all(
+                    math.isclose(a[key], b[key], rel_tol=1e-9, abs_tol=1e-6) for key in ("total", "min", "max")):
+                bad.append(category)
+        return sorted(bad)
@@ -0,0 +1,113 @@
+"""Streaming import and export of expenses as CSV, JSON Lines or JSON.
+
+Imports are read row by row and validated in batches; nothing is written
+unless every row is valid (see ExpenseJournal.extend and
+SqliteExpenses.extend, which commit an import as a single write). Exports
+write one expense at a time as they are read from the store.
+"""
+import csv
+import json
+import math
+import os
+
+FIELDS = ("amount", "category", "description")
+
+# Validation errors reported before an import gives up
+MAX_REPORTED_ERRORS = 10
+
+class ExpenseImportError(ValueError):
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(errors[:MAX_REPORTED_ERRORS]))
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lower()
+    return {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "json"}.get(extension, "jsonl")
+
+def read_rows(path, fmt=None):
+    """Yield (line_number, row dict) from a CSV or JSON Lines file"""
+    fmt = detect_format(path, fmt)
+    if fmt == "csv":
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+    elif fmt == "jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except ValueError as e:
+                        yield line_number, e
+    else:
+        raise ValueError(f"Cannot stream-import {fmt} files; use CSV or JSON Lines")
+
+def validate(row):
+    """Return a clean expense dict, or raise ValueError"""
+    if isinstance(row, Exception):
+        raise ValueError(f"invalid JSON ({row})")
+    if not isinstance(row, dict):
+        raise ValueError("expected an object with amount, category and description")
+    try:
+        amount = float(row.get("amount"))
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid amount {row.get('amount')!r}")
+    if not math.isfinite(amount):
+        raise ValueError(f"invalid amount {row.get('amount')!r}")
+    category = str(row.get("category") or "").strip()
+    if not category:
+        raise ValueError("missing category")
+    return {"amount": amount, "category": category, "description": str(row.get("description") or "").strip()}
+
+def validated(rows, batch_size=1000):
+    """Validate (line_number, row) pairs a batch at a time and yield expenses.
+
+    Raises ExpenseImportError listing every bad row of the first batch that
+    has any, before yielding anything from that batch.
+    """
+    batch = []
+    for item in rows:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield from _validate_batch(batch)
+            batch = []
+    if batch:
+        yield from _validate_batch(batch)
+
+def _validate_batch(batch):
+    expenses, errors = [], []
+    for line_number, row in batch:
+        try:
+            expenses.append(validate(row))
+        except ValueError as e:
+            errors.append(f"line {line_number}: {e}")
+    if errors:
+        raise ExpenseImportError(errors)
+    return expenses
+
+def write_export(expenses, path, fmt=None):
+    """Stream expenses to path; returns the number written"""
+    fmt = detect_format(path, fmt)
+    count = 0
+    with open(path, "w", newline="" if fmt == "csv" else None, encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            for exp in expenses:
+                writer.writerow(exp)
+                count += 1
+        elif fmt == "jsonl":
+            for exp in expenses:
+                f.write(json.dumps(exp, ensure_ascii=False) + "\n")
+                count += 1
+        else:
+            # Same layout as expenses.json, written one element at a time
+            f.write("[")
+            for exp in expenses:
+                f.write(("," if count else "") + "\n    " + json.dumps(exp, ensure_ascii=False))
+                count += 1
+            f.write("\n]\n" if count else "]\n")
+    return count
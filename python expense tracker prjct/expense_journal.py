@@ -0,0 +1,249 @@
+"""Append-only journal storage for the expense tracker.
+
+Every add and delete is appended as one JSON line to the current journal
+generation (expenses.journal.<gen>), so a change costs O(1) no matter how
+many expenses exist. Writes are fsynced in batches: after `sync_every`
+records, or by the background thread every `sync_interval` seconds.
+
+The background thread also compacts: once `compact_every` records have been
+journaled it starts a new generation, writes the current expenses as a
+snapshot tagged with that generation (temp file + rename) and removes the
+older journal files. Loading replays the snapshot plus the journal
+generations at or after it. A line torn by a crash is dropped on load.
+
+Per-category aggregates are kept up to date with every change and saved in
+the snapshot, so summaries never scan the expenses.
+
+Expenses are held in a columnar ExpenseTable, and snapshots use the same
+column layout so loading fills the table without building per-row dicts.
+"""
+import atexit
+import glob
+import json
+import os
+import threading
+
+from expense_aggregates import CategoryAggregates, recompute
+from expense_table import ExpenseTable
+
+class ExpenseJournal:
+    """List-like expense store: supports len(), iteration, indexing,
+    append() and pop(), and persists every change as it happens."""
+
+    def __init__(self, path="expenses.journal", snapshot_path="expenses.snapshot.json", legacy_path=None,
+                 sync_every=64, sync_interval=1.0, compact_every=10000):
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.legacy_path = legacy_path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_every = compact_every
+        self.expenses = ExpenseTable()
+        self.aggregates = CategoryAggregates()
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._file = None
+        self._gen = 0
+        self._unsynced = 0
+        self._since_snapshot = 0
+
+    def _journal_path(self, gen):
+        return f"{self.path}.{gen:06d}"
+
+    def _generations(self):
+        gens = []
+        for name in glob.glob(glob.escape(self.path) + ".*"):
+            suffix = name[len(self.path) + 1:]
+            if suffix.isdigit():
+                gens.append(int(suffix))
+        return sorted(gens)
+
+    def open(self, verify=False):
+        """Replay the snapshot and journal tail, then start accepting changes.
+
+        With verify, the maintained aggregates are checked against a full
+        recompute and replaced by it if they disagree.
+        """
+        base_gen = 0
+        snapshot = {}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+            base_gen = snapshot["gen"]
+            if "columns" in snapshot:
+                self.expenses = ExpenseTable.from_columns(snapshot["columns"])
+            else:
+                self.expenses = ExpenseTable.from_expenses(snapshot["expenses"])
+        elif self.legacy_path and os.path.exists(self.legacy_path):
+            # Plain expenses.json from before the journal is the initial snapshot
+            with open(self.legacy_path, "r") as f:
+                self.expenses = ExpenseTable.from_expenses(json.load(f))
+        if "aggregates" in snapshot:
+            self.aggregates = CategoryAggregates.from_dict(snapshot["aggregates"])
+        else:
+            self.aggregates = recompute(self.expenses)
+
+        # An import interrupted before its rename never became part of the journal
+        for stale in glob.glob(glob.escape(self.path) + ".*.tmp"):
+            os.remove(stale)
+        gens = [gen for gen in self._generations() if gen >= base_gen]
+        for gen in gens:
+            self._since_snapshot += self._replay(self._journal_path(gen))
+        self._gen = gens[-1] if gens else base_gen
+        self._file = open(self._journal_path(self._gen), "a")
+        if verify:
+            self.verify_aggregates()
+
+        threading.Thread(target=self._background, daemon=True).start()
+        atexit.register(self.close)
+        return self
+
+    def _replay(self, path):
+        applied = 0
+        valid_bytes = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._apply(json.loads(line))
+                applied += 1
+                valid_bytes += len(line)
+        if valid_bytes != os.path.getsize(path):
+            with open(path, "r+b") as f:
+                f.truncate(valid_bytes)
+        return applied
+
+    def _apply(self, record):
+        if record["op"] == "add":
+            expense = record["expense"]
+            self.expenses.append(expense)
+            self.aggregates.add(expense["amount"], expense["category"])
+        else:
+            expense = self.expenses.pop(record["index"])
+            self.aggregates.remove(expense["amount"], expense["category"])
+
+    def verify_aggregates(self):
+        """Compare the maintained aggregates with a full recompute; returns the mismatched categories"""
+        with self._lock:
+            self.aggregates.refresh(self.expenses)
+            expected = recompute(self.expenses)
+            bad = self.aggregates.mismatches(expected)
+            if bad:
+                print(f"Warning: category aggregates out of date for {', '.join(bad)}; recomputed.")
+                self.aggregates = expected
+            return bad
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._unsynced += 1
+        self._since_snapshot += 1
+        if self._unsynced >= self.sync_every:
+            self._sync_locked()
+
+    def _sync_locked(self):
+        if self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def __len__(self):
+        return len(self.expenses)
+
+    def __iter__(self):
+        return iter(self.expenses)
+
+    def __getitem__(self, index):
+        return self.expenses[index]
+
+    def append(self, expense):
+        with self._lock:
+            self.expenses.append(expense)
+            self.aggregates.add(expense["amount"], expense["category"])
+            self._write({"op": "add", "expense": expense})
+
+    def pop(self, index=-1):
+        with self._lock:
+            if index < 0:
+                index += len(self.expenses)
+            removed = self.expenses.pop(index)
+            self.aggregates.remove(removed["amount"], removed["category"])
+            self._write({"op": "del", "index": index})
+            return removed
+
+    def summary(self):
+        """{category: {"total", "count", "min", "max"}} without scanning the expenses"""
+        with self._lock:
+            return self.aggregates.summary(self.expenses)
+
+    def extend(self, expenses):
+        """Journal many expenses as one write: they go to a new generation
+        file that is renamed into place only after all of them are written,
+        so an import that fails part way leaves nothing behind."""
+        with self._compact_lock, self._lock:
+            self._sync_locked()
+            gen = self._gen + 1
+            path = self._journal_path(gen)
+            tmp_path = path + ".tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    for expense in expenses:
+                        f.write(json.dumps({"op": "add", "expense": expense}, separators=(",", ":")) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            self._file.close()
+            os.replace(tmp_path, path)
+            self._gen = gen
+            self._file = open(path, "a")
+            added = self._replay(path)
+            self._since_snapshot += added
+            return added
+
+    def page(self, offset=0, limit=50):
+        with self._lock:
+            return [self.expenses[i] for i in range(offset, min(offset + limit, len(self.expenses)))]
+
+    def sync(self):
+        with self._lock:
+            self._sync_locked()
+
+    def compact(self):
+        """Snapshot the current expenses and drop the journal generations it covers"""
+        with self._compact_lock:
+            with self._lock:
+                self._sync_locked()
+                self._file.close()
+                self._gen += 1
+                self._file = open(self._journal_path(self._gen), "a")
+                expenses = self.expenses.copy()
+                aggregates = self.aggregates.copy()
+                gen = self._gen
+                self._since_snapshot = 0
+
+            aggregates.refresh(expenses)
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"gen": gen, "columns": expenses.to_columns(), "aggregates": aggregates.to_dict()}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            for old_gen in self._generations():
+                if old_gen < gen:
+                    os.remove(self._journal_path(old_gen))
+
+    def _background(self):
+        while not self._closed.wait(self.sync_interval):
+            self.sync()
+            if self._since_snapshot >= self.compact_every:
+                self.compact()
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        with self._compact_lock, self._lock:
+            self._sync_locked()
+            self._file.close()
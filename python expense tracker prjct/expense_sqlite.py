@@ -0,0 +1,199 @@
+"""SQLite storage for the expense tracker.
+
+Expenses live in an indexed table instead of an in-memory list: iteration
+streams rows from a cursor and summaries are SQL aggregates, so memory use
+and summary time stay flat as the table grows to millions of rows.
+
+Per-category totals are kept in category_totals by triggers on every insert
+and delete, so a summary reads one row per category. Deleting a category's
+current minimum or maximum looks up the new bound through the
+(category, amount) index.
+"""
+import json
+import os
+import sqlite3
+import time
+
+from expense_aggregates import CategoryAggregates
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS expenses (
+    id INTEGER PRIMARY KEY,
+    amount REAL NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_expenses_category_amount ON expenses (category, amount);
+CREATE INDEX IF NOT EXISTS idx_expenses_amount ON expenses (amount);
+CREATE INDEX IF NOT EXISTS idx_expenses_created_at ON expenses (created_at);
+CREATE TABLE IF NOT EXISTS category_totals (
+    category TEXT PRIMARY KEY,
+    total REAL NOT NULL,
+    count INTEGER NOT NULL,
+    min_amount REAL NOT NULL,
+    max_amount REAL NOT NULL,
+    first_id INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS expenses_insert_totals AFTER INSERT ON expenses BEGIN
+    INSERT INTO category_totals (category, total, count, min_amount, max_amount, first_id)
+    VALUES (new.category, new.amount, 1, new.amount, new.amount, new.id)
+    ON CONFLICT (category) DO UPDATE SET
+        total = total + excluded.total,
+        count = count + 1,
+        min_amount = MIN(min_amount, excluded.min_amount),
+        max_amount = MAX(max_amount, excluded.max_amount);
+END;
+CREATE TRIGGER IF NOT EXISTS expenses_delete_totals AFTER DELETE ON expenses BEGIN
+    DELETE FROM category_totals WHERE category = old.category AND count = 1;
+    UPDATE category_totals SET
+        total = total - old.amount,
+        count = count - 1,
+        min_amount = CASE WHEN old.amount > min_amount THEN min_amount
+            ELSE (SELECT MIN(amount) FROM expenses WHERE category = old.category) END,
+        max_amount = CASE WHEN old.amount < max_amount THEN max_amount
+            ELSE (SELECT MAX(amount) FROM expenses WHERE category = old.category) END,
+        first_id = CASE WHEN old.id > first_id THEN first_id
+            ELSE (SELECT MIN(id) FROM expenses WHERE category = old.category) END
+    WHERE category = old.category;
+END;
+"""
+
+REBUILD_TOTALS = """
+DELETE FROM category_totals;
+INSERT INTO category_totals (category, total, count, min_amount, max_amount, first_id)
+SELECT category, SUM(amount), COUNT(*), MIN(amount), MAX(amount), MIN(id) FROM expenses GROUP BY category;
+"""
+
+# PRAGMA user_version: 1 = expenses.json imported, 2 = category_totals populated
+SCHEMA_VERSION = 2
+
+# Rows fetched per round trip when streaming
+FETCH_SIZE = 1000
+
+def _row_to_expense(row):
+    return {"amount": row[0], "category": row[1], "description": row[2]}
+
+class SqliteExpenses:
+    """List-like expense store backed by SQLite; positions follow insertion order"""
+
+    def __init__(self, path="expenses.sqlite"):
+        self.path = path
+        self.conn = None
+
+    def open(self, legacy_path=None, verify=False):
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0 and legacy_path and os.path.exists(legacy_path):
+            # The triggers fill category_totals as the rows go in
+            self.import_json(legacy_path)
+        elif version == 1:
+            # Created before category_totals existed
+            self.conn.executescript(REBUILD_TOTALS)
+        if version < SCHEMA_VERSION:
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        if verify:
+            self.verify_aggregates()
+        return self
+
+    def import_json(self, path):
+        """Bulk insert a list-of-dicts expenses.json in one transaction"""
+        with open(path, "r") as f:
+            expenses = json.load(f)
+        return self.extend(expenses)
+
+    def extend(self, expenses):
+        """Insert expenses in one transaction; nothing is kept if the iterable raises"""
+        now = time.time()
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT INTO expenses (amount, category, description, created_at) VALUES (?, ?, ?, ?)",
+                ((float(e["amount"]), e["category"], e.get("description", ""), now) for e in expenses)
+            )
+        return cursor.rowcount
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+
+    def __bool__(self):
+        return self.conn.execute("SELECT EXISTS (SELECT 1 FROM expenses)").fetchone()[0] == 1
+
+    def __iter__(self):
+        cursor = self.conn.execute("SELECT amount, category, description FROM expenses ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                return
+            for row in rows:
+                yield _row_to_expense(row)
+
+    def _id_at(self, index):
+        if index < 0:
+            index += len(self)
+        row = None
+        if index >= 0:
+            row = self.conn.execute("SELECT id FROM expenses ORDER BY id LIMIT 1 OFFSET ?", (index,)).fetchone()
+        if row is None:
+            raise IndexError("expense index out of range")
+        return row[0]
+
+    def __getitem__(self, index):
+        row = self.conn.execute(
+            "SELECT amount, category, description FROM expenses WHERE id = ?", (self._id_at(index),)
+        ).fetchone()
+        return _row_to_expense(row)
+
+    def page(self, offset=0, limit=50):
+        rows = self.conn.execute(
+            "SELECT amount, category, description FROM expenses ORDER BY id LIMIT ? OFFSET ?", (limit, offset)
+        )
+        return [_row_to_expense(row) for row in rows]
+
+    def append(self, expense):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO expenses (amount, category, description, created_at) VALUES (?, ?, ?, ?)",
+                (float(expense["amount"]), expense["category"], expense.get("description", ""), time.time())
+            )
+
+    def pop(self, index=-1):
+        expense_id = self._id_at(index)
+        with self.conn:
+            row = self.conn.execute(
+                "SELECT amount, category, description FROM expenses WHERE id = ?", (expense_id,)
+            ).fetchone()
+            self.conn.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
+        return _row_to_expense(row)
+
+    def _aggregates(self, table_sql):
+        stats = {}
+        for category, total, count, low, high in self.conn.execute(table_sql):
+            stats[category] = [total, count, low, high]
+        return CategoryAggregates(stats)
+
+    def summary(self):
+        """{category: {"total", "count", "min", "max"}} in first-seen order, from category_totals"""
+        return self._aggregates(
+            "SELECT category, total, count, min_amount, max_amount FROM category_totals ORDER BY first_id"
+        ).to_dict()
+
+    def verify_aggregates(self):
+        """Compare category_totals with a GROUP BY over expenses; rebuilds it on mismatch"""
+        maintained = self._aggregates("SELECT category, total, count, min_amount, max_amount FROM category_totals")
+        expected = self._aggregates(
+            "SELECT category, SUM(amount), COUNT(*), MIN(amount), MAX(amount) FROM expenses GROUP BY category"
+        )
+        bad = maintained.mismatches(expected)
+        if bad:
+            print(f"Warning: category aggregates out of date for {', '.join(bad)}; recomputed.")
+            with self.conn:
+                self.conn.executescript(REBUILD_TOTALS)
+        return bad
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
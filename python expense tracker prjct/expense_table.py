@@ -0,0 +1,182 @@
+"""Columnar in-memory storage for expenses.
+
+Amounts are an array('d'), categories are dictionary-encoded as small
+integer codes and descriptions share one UTF-8 string pool, so an expense
+costs about 20 bytes plus its description instead of a dict with three
+boxed values. ExpenseTable behaves like the list of dicts it replaces:
+len(), iteration and indexing yield dicts, and append()/pop() take and
+return dicts.
+
+    python expense_table.py --rows 1000000
+"""
+import argparse
+import random
+import tracemalloc
+from array import array
+
+class ExpenseTable:
+    def __init__(self):
+        self.amounts = array("d")
+        self.codes = array("H")
+        self.categories = []
+        self._category_codes = {}
+        # Description i is pool[starts[i]:starts[i] + lengths[i]]
+        self.pool = bytearray()
+        self.starts = array("Q")
+        self.lengths = array("I")
+        self._garbage = 0
+
+    @classmethod
+    def from_expenses(cls, expenses):
+        table = cls()
+        table.extend(expenses)
+        return table
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Build from the to_columns() layout without going through per-row dicts"""
+        table = cls()
+        table.categories = list(columns["categories"])
+        table._category_codes = {name: code for code, name in enumerate(table.categories)}
+        table.codes = array("H" if len(table.categories) <= 0xFFFF else "I", columns["category_codes"])
+        table.amounts = array("d", columns["amounts"])
+        for description in columns["descriptions"]:
+            table._add_description(description)
+        return table
+
+    def to_columns(self):
+        return {
+            "amounts": self.amounts.tolist(),
+            "categories": list(self.categories),
+            "category_codes": self.codes.tolist(),
+            "descriptions": [self._description(i) for i in range(len(self))]
+        }
+
+    def copy(self):
+        table = ExpenseTable()
+        table.amounts = array("d", self.amounts)
+        table.codes = array(self.codes.typecode, self.codes)
+        table.categories = list(self.categories)
+        table._category_codes = dict(self._category_codes)
+        table.pool = bytearray(self.pool)
+        table.starts = array("Q", self.starts)
+        table.lengths = array("I", self.lengths)
+        table._garbage = self._garbage
+        return table
+
+    def _code(self, category):
+        code = self._category_codes.get(category)
+        if code is None:
+            code = len(self.categories)
+            if code > 0xFFFF and self.codes.typecode == "H":
+                self.codes = array("I", self.codes)
+            self.categories.append(category)
+            self._category_codes[category] = code
+        return code
+
+    def _add_description(self, description):
+        encoded = description.encode("utf-8")
+        self.starts.append(len(self.pool))
+        self.lengths.append(len(encoded))
+        self.pool += encoded
+
+    def _description(self, index):
+        start = self.starts[index]
+        return self.pool[start:start + self.lengths[index]].decode("utf-8")
+
+    def _row(self, index):
+        return {
+            "amount": self.amounts[index],
+            "category": self.categories[self.codes[index]],
+            "description": self._description(index)
+        }
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def __iter__(self):
+        for index in range(len(self.amounts)):
+            yield self._row(index)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("expense index out of range")
+        return self._row(index)
+
+    def append(self, expense):
+        self.amounts.append(float(expense["amount"]))
+        self.codes.append(self._code(expense["category"]))
+        self._add_description(expense.get("description", ""))
+
+    def extend(self, expenses):
+        for expense in expenses:
+            self.append(expense)
+
+    def pop(self, index=-1):
+        removed = self[index]
+        if index < 0:
+            index += len(self)
+        self.amounts.pop(index)
+        self.codes.pop(index)
+        self.starts.pop(index)
+        self._garbage += self.lengths.pop(index)
+        if self._garbage > len(self.pool) // 2:
+            self._compact_pool()
+        return removed
+
+    def _compact_pool(self):
+        pool = bytearray()
+        starts = array("Q")
+        for start, length in zip(self.starts, self.lengths):
+            starts.append(len(pool))
+            pool += self.pool[start:start + length]
+        self.pool, self.starts, self._garbage = pool, starts, 0
+
+    def memory_bytes(self):
+        """Bytes held by the columns, the string pool and the category dictionary"""
+        columns = (self.amounts, self.codes, self.starts, self.lengths)
+        return (sum(column.buffer_info()[1] * column.itemsize for column in columns) + len(self.pool)
+                + sum(len(name) for name in self.categories))
+
+def _sample_expenses(rows, seed=0):
+    rng = random.Random(seed)
+    categories = ["Food", "Transport", "Entertainment", "Rent", "Utilities", "Health", "Shopping", "Travel"]
+    for i in range(rows):
+        yield {
+            "amount": round(rng.uniform(1, 500), 2),
+            "category": rng.choice(categories),
+            "description": f"Card payment #{i}"
+        }
+
+def _traced_bytes(build):
+    tracemalloc.start()
+    try:
+        data = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return data, size
+
+def benchmark_memory(rows):
+    """Heap bytes of the same expenses as a list of dicts and as an ExpenseTable"""
+    _, list_bytes = _traced_bytes(lambda: list(_sample_expenses(rows)))
+    _, table_bytes = _traced_bytes(lambda: ExpenseTable.from_expenses(_sample_expenses(rows)))
+    return {"rows": rows, "list_of_dicts_bytes": list_bytes, "table_bytes": table_bytes}
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory of list-of-dicts vs columnar expenses")
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    result = benchmark_memory(args.rows)
+    print(f"Expenses: {result['rows']}")
+    print(f"List of dicts: {result['list_of_dicts_bytes'] / 2**20:.1f} MiB "
+          f"({result['list_of_dicts_bytes'] / result['rows']:.0f} bytes/expense)")
+    print(f"ExpenseTable:  {result['table_bytes'] / 2**20:.1f} MiB "
+          f"({result['table_bytes'] / result['rows']:.0f} bytes/expense)")
+    print(f"Reduction: {result['list_of_dicts_bytes'] / result['table_bytes']:.1f}x")
+
+if __name__ == "__main__":
+    main()
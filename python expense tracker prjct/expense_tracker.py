@@ -1,17 +1,28 @@
-import json
+import argparse
 import os
+import sys
+
+from expense_aggregates import recompute
+from expense_io import read_rows, validated, write_export
+from expense_journal import ExpenseJournal
+from expense_sqlite import SqliteExpenses
 
 DATA_FILE = "expenses.json"
+JOURNAL_FILE = "expenses.journal"
+SNAPSHOT_FILE = "expenses.snapshot.json"
+SQLITE_FILE = "expenses.sqlite"
 
-def load_expenses():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return []
+# "journal" (default) keeps expenses in memory; "sqlite" keeps them in an indexed database
+BACKEND = os.environ.get("EXPENSE_BACKEND", "journal")
+# Check the maintained category aggregates against a full recompute on load
+DEBUG = os.environ.get("EXPENSE_TRACKER_DEBUG") == "1"
 
-def save_expenses(expenses):
-    with open(DATA_FILE, "w") as f:
-        json.dump(expenses, f, indent=4)
+def load_expenses(backend=BACKEND):
+    # Changes are persisted as they happen; an existing expenses.json is
+    # picked up as the starting point
+    if backend == "sqlite":
+        return SqliteExpenses(SQLITE_FILE).open(legacy_path=DATA_FILE, verify=DEBUG)
+    return ExpenseJournal(JOURNAL_FILE, SNAPSHOT_FILE, legacy_path=DATA_FILE).open(verify=DEBUG)
 
 def add_expense(expenses):
     try:
@@ -24,7 +35,6 @@ def add_expense(expenses):
             "description": description
         }
         expenses.append(expense)
-        save_expenses(expenses)
         print("Expense added successfully.\n")
     except ValueError:
         print("Invalid amount entered. Please try again.\n")
@@ -46,7 +56,6 @@ def delete_expense(expenses):
         idx = int(input("Enter the number of the expense to delete: "))
         if 1 <= idx <= len(expenses):
             removed = expenses.pop(idx - 1)
-            save_expenses(expenses)
             print(f"Removed expense: {removed['category']} - ${removed['amount']:.2f}\n")
         else:
             print("Invalid number.\n")
@@ -57,16 +66,43 @@ def summary_by_category(expenses):
     if not expenses:
         print("No expenses recorded.\n")
         return
-    summary = {}
-    for exp in expenses:
-        summary[exp['category']] = summary.get(exp['category'], 0) + exp['amount']
+    if hasattr(expenses, "summary"):
+        summary = expenses.summary()
+    else:
+        summary = recompute(expenses).to_dict()
     print("\n--- Expense Summary by Category ---")
-    for category, total in summary.items():
-        print(f"{category}: ${total:.2f}")
+    for category, stats in summary.items():
+        print(f"{category}: ${stats['total']:.2f} ({stats['count']} expenses, "
+              f"min ${stats['min']:.2f}, max ${stats['max']:.2f})")
+    print()
+
+def list_expenses(expenses, page=1, page_size=50):
+    total = len(expenses)
+    if not total:
+        print("No expenses recorded.\n")
+        return 0
+    pages = (total + page_size - 1) // page_size
+    if page > pages:
+        print(f"Page {page} does not exist; there {'is' if pages == 1 else 'are'} {pages} "
+              f"page{'' if pages == 1 else 's'} of {page_size}.")
+        return 1
+    offset = (page - 1) * page_size
+    print(f"\n--- Expenses (page {page} of {pages}, {total} total) ---")
+    for i, exp in enumerate(expenses.page(offset, page_size), start=offset + 1):
+        print(f"{i}. {exp['category']} - ${exp['amount']:.2f} : {exp['description']}")
     print()
+    return 0
+
+def import_expenses(expenses, path, fmt=None, batch_size=1000):
+    try:
+        count = expenses.extend(validated(read_rows(path, fmt), batch_size))
+    except ValueError as e:
+        print(f"Import failed, nothing was saved: {e}")
+        return 1
+    print(f"Imported {count} expenses from {path}.")
+    return 0
 
-def main():
-    expenses = load_expenses()
+def run_menu(expenses):
     while True:
         print("Expense Tracker Menu:")
         print("1. Add Expense")
@@ -90,5 +126,48 @@ def main():
         else:
             print("Invalid option. Try again.\n")
 
+def positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a whole number, got {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Expense Tracker (interactive menu when run without a command)")
+    parser.add_argument("--backend", choices=["journal", "sqlite"], default=BACKEND)
+    subparsers = parser.add_subparsers(dest="command")
+    import_parser = subparsers.add_parser("import", help="add expenses from a CSV or JSON Lines file")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=["csv", "jsonl"])
+    import_parser.add_argument("--batch-size", type=int, default=1000, help="rows validated at a time")
+    export_parser = subparsers.add_parser("export", help="write all expenses to a CSV, JSON Lines or JSON file")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--format", choices=["csv", "jsonl", "json"])
+    subparsers.add_parser("summary", help="print totals by category")
+    list_parser = subparsers.add_parser("list", help="print one page of expenses")
+    list_parser.add_argument("--page", type=positive_int, default=1)
+    list_parser.add_argument("--page-size", type=positive_int, default=50)
+    args = parser.parse_args(argv)
+
+    expenses = load_expenses(args.backend)
+    try:
+        if args.command == "import":
+            return import_expenses(expenses, args.path, args.format, args.batch_size)
+        if args.command == "export":
+            count = write_export(expenses, args.path, args.format)
+            print(f"Exported {count} expenses to {args.path}.")
+        elif args.command == "summary":
+            summary_by_category(expenses)
+        elif args.command == "list":
+            return list_expenses(expenses, args.page, args.page_size)
+        else:
+            run_menu(expenses)
+        return 0
+    finally:
+        expenses.close()
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Pre-forking production entry point for the Fake News Detection API.
+
+The parent binds the listening socket once and forks N workers that all
+accept on it, so requests are spread across cores by the kernel. Each worker
+handles its requests on threads, so MICRO_BATCH_ENABLED=1 can coalesce
+concurrent /predict calls within a worker.
+
+    python serve.py --workers 4 --port 5000
+    python serve.py --workers 4 --port 5000 --mode streaming
+
+Without --mode the registry's active version is served. Every worker checks
+registry.json before each request and loads the new active version when it
+changes, so activating, rolling back or finishing a training job in one
+worker (or with model_registry.py) switches all of them.
+
+Streaming models are loaded by each worker with joblib mmap_mode='r', so the
+coefficient arrays live once in the page cache instead of once per worker.
+Other models are loaded in the parent before forking and shared copy-on-write.
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+
+from werkzeug.serving import make_server
+
+import app as api
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Fake News Detection API with pre-forked workers")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--mode', choices=sorted(api.DETECTOR_CLASSES),
+                        help="which persisted model to serve (default: the active registry "
+                             "version, else full)")
+    parser.add_argument('--backlog', type=int, default=1024)
+    return parser.parse_args(argv)
+
+
+def serving_plan(args):
+    """(registry version or None, mode) that the workers will serve"""
+    version = api.model_registry.active() if args.mode is None else None
+    meta = api.model_registry.get(version) if version else None
+    if meta is None:
+        return None, args.mode or 'full'
+    return version, meta["mode"]
+
+
+def load_serving_model(version, mode):
+    try:
+        if version is not None:
+            api.serve_version(version)
+        elif mode in api.MMAP_MODES:
+            api.load_model(mode, mmap_mode='r')
+        else:
+            api.load_model(mode)
+        return True
+    except Exception as e:
+        print(f"[{os.getpid()}] No pre-trained model loaded ({e}). Please train the model first.")
+        return False
+
+
+def run_worker(sock, args, version, mode):
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    signal.signal(signal.SIGINT, lambda *_: sys.exit(0))
+    if mode in api.MMAP_MODES:
+        load_serving_model(version, mode)
+    # A restarted worker serves whatever is active now, not what the parent loaded
+    api.follow_registry_changes()
+    # Threaded, like app.run(): concurrent requests in one worker are what
+    # MICRO_BATCH_ENABLED coalesces into a single model call
+    server = make_server(args.host, args.port, api.app, threaded=True, fd=sock.fileno())
+    server.serve_forever()
+
+
+def spawn_worker(sock, args, version, mode):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(sock, args, version, mode)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(args.backlog)
+    sock.set_inheritable(True)
+
+    version, mode = serving_plan(args)
+    if mode not in api.MMAP_MODES:
+        load_serving_model(version, mode)
+
+    workers = {spawn_worker(sock, args, version, mode) for _ in range(args.workers)}
+    print(f"Serving on {args.host}:{args.port} with {len(workers)} workers "
+          f"({f'version {version}, ' if version else ''}{mode} model)")
+
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # Reap workers, replacing any that die while we are still serving
+    while workers:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            print(f"Worker {pid} exited, restarting")
+            workers.add(spawn_worker(sock, args, version, mode))
+
+    sock.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+import copy
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from metrics import registry as metrics
+
+CLASSES = np.array([0, 1])
+
+
+class StreamingFakeNewsDetector:
+    """Out-of-core variant of FakeNewsDetector.
+
+    Texts are vectorized with a stateless HashingVectorizer and the classifier
+    is an SGD logistic regression trained with partial_fit, so training reads
+    the CSV in chunks and peak memory does not grow with the corpus.
+    """
+
+    def __init__(self, n_features=2 ** 20, chunksize=50000, test_every=5):
+        # sklearn is imported here rather than at module level so serving
+        # other model types does not pay for it at startup
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.linear_model import SGDClassifier
+
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm='l2'
+        )
+        self.model = SGDClassifier(loss='log_loss', alpha=1e-6, random_state=42)
+        self.chunksize = chunksize
+        # Every test_every-th row is held out for accuracy, like a 20% test split
+        self.test_every = test_every
+        self.is_trained = False
+
+    def _chunks(self, data_path):
+        from dataset_io import iter_dataset_chunks
+
+        offset = 0
+        for chunk in iter_dataset_chunks(data_path, columns=['text', 'label'], chunksize=self.chunksize):
+            chunk = chunk.dropna()
+            is_test = (np.arange(offset, offset + len(chunk)) % self.test_every) == 0
+            offset += len(chunk)
+            yield chunk['text'].astype(str), chunk['label'].astype(int).to_numpy(), is_test
+
+    def partial_train(self, texts, labels):
+        """Fold a batch of labelled texts into the model"""
+        self.model.partial_fit(self.vectorizer.transform(texts), labels, classes=CLASSES)
+        self.is_trained = True
+
+    def updated_with(self, texts, labels):
+        """Return a copy of this detector with a batch of labelled texts folded in.
+
+        The live instance is left untouched so it can keep serving; the copy
+        also owns writable arrays even if this one was loaded with mmap_mode.
+        """
+        updated = copy.copy(self)
+        updated.model = copy.deepcopy(self.model)
+        updated.model.coef_ = np.array(self.model.coef_)
+        updated.model.intercept_ = np.array(self.model.intercept_)
+        updated.partial_train(texts, np.asarray(labels, dtype=int))
+        return updated
+
+    def train(self, data_path):
+        """Train over a CSV, Parquet or Arrow file chunk by chunk and return held-out accuracy"""
+        start = time.time()
+        for texts, labels, is_test in self._chunks(data_path):
+            if (~is_test).any():
+                self.partial_train(texts[~is_test], labels[~is_test])
+
+        # Second pass scores the held-out rows with the final model
+        correct = total = 0
+        for texts, labels, is_test in self._chunks(data_path):
+            if is_test.any():
+                predicted = self.model.predict(self.vectorizer.transform(texts[is_test]))
+                correct += int((predicted == labels[is_test]).sum())
+                total += int(is_test.sum())
+
+        accuracy = correct / total if total else 0.0
+        print(f"Streaming training finished in {time.time() - start:.2f}s, accuracy: {accuracy:.4f}")
+        return accuracy
+
+    def predict_batch(self, texts):
+        with metrics.timer('model_stage_seconds', (('stage', 'vectorize'),)):
+            features = self.vectorizer.transform(texts)
+        with metrics.timer('model_stage_seconds', (('stage', 'score'),)):
+            probabilities = self.model.predict_proba(features)[:, 1]
+        return [
+            {
+                "label": "FAKE" if p >= 0.5 else "REAL",
+                "confidence": float(p if p >= 0.5 else 1 - p),
+                "fake_probability": float(p)
+            }
+            for p in probabilities
+        ]
+
+    def predict(self, text):
+        return self.predict_batch([text])[0]
+
+    def save_model(self, path='streaming_model.joblib'):
+        import joblib
+
+        # serve.py workers memory-map this file, so it is never rewritten in
+        # place: a new file is written alongside and renamed over it
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                joblib.dump({"vectorizer": self.vectorizer, "model": self.model}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def load_model(self, path='streaming_model.joblib', mmap_mode=None):
+        """Load a saved model; mmap_mode='r' maps the coefficient arrays
+        read-only so pre-forked workers share one copy through the page cache"""
+        import joblib
+
+        saved = joblib.load(path, mmap_mode=mmap_mode)
+        self.vectorizer = saved["vectorizer"]
+        self.model = saved["model"]
+        self.is_trained = True
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from compact_model import CompactFakeNewsDetector, export_compact
+
+sklearn = pytest.importorskip("sklearn")
+from sklearn.feature_extraction.text import TfidfVectorizer  # noqa: E402
+from sklearn.linear_model import LogisticRegression  # noqa: E402
+
+FAKE = [
+    "BREAKING: alien technology discovered, scientists stunned",
+    "Miracle cure for diabetes hidden by doctors",
+    "Government hiding time travel machine in desert base",
+    "Celebrity clone spotted at secret moon party",
+    "Shocking: vaccines contain tracking microchips",
+    "Free energy device suppressed by oil companies",
+]
+REAL = [
+    "City council approves new budget for public schools",
+    "Study shows education reform improves literacy rates",
+    "Local library extends weekend opening hours",
+    "Stock market closes slightly higher after jobs report",
+    "Health officials recommend seasonal flu vaccination",
+    "New bus routes announced for the downtown area",
+]
+PROBES = FAKE + REAL + [
+    "",
+    "completely unseen words only",
+    "Scientists discover new cure for public schools budget",
+    "BREAKING BREAKING BREAKING alien alien",
+]
+
+# Largest allowed |p_compact - p_sklearn| for each stored precision
+TOLERANCES = {None: 1e-5, "float16": 2e-3, "int8": 2e-2}
+
+
+@pytest.fixture(params=[
+    {},
+    {"ngram_range": (1, 2), "sublinear_tf": True},
+    {"norm": "l1", "stop_words": "english"},
+], ids=["default", "bigrams-sublinear", "l1-stopwords"])
+def pipeline(request):
+    vectorizer = TfidfVectorizer(**request.param)
+    classifier = LogisticRegression(C=10.0, max_iter=1000)
+    classifier.fit(vectorizer.fit_transform(FAKE + REAL), [1] * len(FAKE) + [0] * len(REAL))
+    return vectorizer, classifier
+
+
+@pytest.mark.parametrize("quantize", [None, "float16", "int8"])
+def test_compact_matches_sklearn(pipeline, quantize, tmp_path):
+    vectorizer, classifier = pipeline
+    path = str(tmp_path / "model.npz")
+    export_compact(vectorizer, classifier, path, quantize)
+
+    compact = CompactFakeNewsDetector()
+    compact.load_model(path)
+    results = compact.predict_batch(PROBES)
+
+    expected = classifier.predict_proba(vectorizer.transform(PROBES))[:, 1]
+    actual = np.array([r["fake_probability"] for r in results])
+    assert np.abs(actual - expected).max() <= TOLERANCES[quantize]
+    assert [r["label"] for r in results] == ["FAKE" if p >= 0.5 else "REAL" for p in expected]
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from expense_aggregates import CategoryAggregates, recompute
+from expense_sqlite import SqliteExpenses
+
+CATEGORIES = ["Food", "Rent", "Travel", "Health"]
+
+
+def random_changes(rng, steps):
+    """Yield ("add", expense) or ("del", index) against a list that starts empty"""
+    size = 0
+    for _ in range(steps):
+        if size and rng.random() < 0.45:
+            yield "del", rng.randrange(size)
+            size -= 1
+        else:
+            # Few distinct amounts, so minimums and maximums are often removed
+            yield "add", {"amount": float(rng.randint(1, 12)), "category": rng.choice(CATEGORIES),
+                          "description": ""}
+            size += 1
+
+
+@pytest.mark.parametrize("start", ["empty", "from_dict", "copy"])
+def test_aggregates_match_recompute(start):
+    rng = random.Random(7)
+    expenses = [{"amount": float(rng.randint(1, 12)), "category": rng.choice(CATEGORIES)} for _ in range(50)]
+    aggregates = recompute(expenses)
+    if start == "from_dict":
+        # As loaded from a snapshot: no per-amount counts until a bound goes stale
+        aggregates = CategoryAggregates.from_dict(aggregates.to_dict())
+    elif start == "copy":
+        aggregates = aggregates.copy()
+
+    for step, (op, value) in enumerate(random_changes(rng, 2000)):
+        if op == "add":
+            expenses.append(value)
+            aggregates.add(value["amount"], value["category"])
+        else:
+            removed = expenses.pop(value)
+            aggregates.remove(removed["amount"], removed["category"])
+        if step % 5 == 0:
+            aggregates.refresh(expenses)
+            assert not aggregates.mismatches(recompute(expenses)), step
+    assert aggregates.summary(expenses) == recompute(expenses).to_dict()
+
+
+def test_sqlite_triggers_match_recompute(tmp_path):
+    store = SqliteExpenses(str(tmp_path / "expenses.sqlite")).open()
+    rng = random.Random(3)
+    for op, value in random_changes(rng, 600):
+        if op == "add":
+            store.append(value)
+        else:
+            store.pop(value)
+
+    assert store.verify_aggregates() == []
+    expected = recompute(list(store))
+    assert not CategoryAggregates.from_dict(store.summary()).mismatches(expected)
+    # category_totals lists categories in first-seen order, like a recompute
+    assert list(store.summary()) == list(expected.to_dict())
+    store.close()
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from expense_aggregates import recompute
+from expense_io import ExpenseImportError, validated
+from expense_journal import ExpenseJournal
+
+
+def expense(i, category="Food"):
+    return {"amount": float(i), "category": category, "description": f"item {i}"}
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "expenses.journal"), str(tmp_path / "expenses.snapshot.json")
+
+
+def open_journal(paths):
+    # The background thread never fires during a test
+    return ExpenseJournal(*paths, sync_interval=3600).open()
+
+
+def test_replay_after_compaction(paths):
+    journal = open_journal(paths)
+    for i in range(5):
+        journal.append(expense(i, "Food" if i % 2 else "Rent"))
+    journal.compact()
+    journal.append(expense(10, "Travel"))
+    journal.pop(0)
+    journal.append(expense(11))
+    expected = list(journal)
+    journal.close()
+
+    # Only the generation written after the snapshot is left to replay
+    assert len(journal._generations()) == 1
+
+    reopened = open_journal(paths)
+    assert list(reopened) == expected
+    # The popped expense was Rent's minimum, so that bound is refreshed on read
+    assert reopened.summary() == recompute(expected).to_dict()
+    assert reopened.verify_aggregates() == []
+    reopened.close()
+
+
+def test_torn_last_line_is_dropped(paths):
+    journal = open_journal(paths)
+    for i in range(3):
+        journal.append(expense(i))
+    journal.close()
+    journal_path = journal._journal_path(journal._gen)
+    size = os.path.getsize(journal_path)
+    with open(journal_path, "a") as f:
+        f.write('{"op":"add","expense":{"amount":9')
+
+    reopened = open_journal(paths)
+    assert [e["amount"] for e in reopened] == [0.0, 1.0, 2.0]
+    assert os.path.getsize(journal_path) == size
+    reopened.append(expense(3))
+    reopened.close()
+
+    assert [e["amount"] for e in open_journal(paths)] == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_failed_import_leaves_nothing(paths, tmp_path):
+    journal = open_journal(paths)
+    journal.append(expense(1))
+
+    def rows():
+        yield expense(2)
+        yield expense(3)
+        raise OSError("disk went away")
+
+    with pytest.raises(OSError):
+        journal.extend(rows())
+    bad_rows = [(1, {"amount": "5", "category": "Food"}), (2, {"amount": "x", "category": "Food"})]
+    with pytest.raises(ExpenseImportError):
+        journal.extend(validated(bad_rows))
+
+    assert [e["amount"] for e in journal] == [1.0]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+    journal.close()
+    assert [e["amount"] for e in open_journal(paths)] == [1.0]
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+pytest.importorskip("joblib")
+
+from model_registry import ARTIFACT_NAME, ModelRegistry, RegistryError  # noqa: E402
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(str(tmp_path / "models"))
+
+
+def register(registry, name):
+    # Any picklable object stands in for a detector
+    return registry.register({"name": name}, "full", accuracy=0.9)["version"]
+
+
+def test_activate_and_rollback(registry):
+    first, second, third = (register(registry, name) for name in ("a", "b", "c"))
+    assert registry.active() is None
+    assert registry.activate(first) is None
+    assert registry.activate(second) == first
+    assert registry.activate(third) == second
+    assert registry.load(registry.active()) == {"name": "c"}
+
+    assert registry.previous() == second
+    assert registry.rollback() == second
+    assert registry.rollback() == first
+    assert registry.active() == first
+    with pytest.raises(RegistryError):
+        registry.rollback()
+
+    # State survives a new instance, as in another serve.py worker
+    reopened = ModelRegistry(registry.root)
+    assert reopened.active() == first
+    assert [meta["active"] for meta in reopened.list()].count(True) == 1
+
+
+def test_unknown_and_tampered_versions_are_rejected(registry):
+    version = register(registry, "a")
+    registry.activate(version)
+    with pytest.raises(RegistryError):
+        registry.activate("no-such-version")
+
+    with open(os.path.join(registry.versions_dir, version, ARTIFACT_NAME), "ab") as f:
+        f.write(b"tampered")
+    with pytest.raises(RegistryError):
+        registry.load(version)
+    assert registry.active() == version
+    assert not [name for name in os.listdir(registry.root) if name.startswith(".staging-")]
@@ -0,0 +1,183 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing, contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has no fork(), so serve.py never runs there and there is one process
+    fcntl = None
+
+from model_registry import register_trained
+from streaming_model import StreamingFakeNewsDetector
+
+# Stages a job moves through, with the progress reported once it reaches each one
+STAGES = {
+    "queued": 0.0,
+    "training": 0.1,
+    "loading": 0.9,
+    "completed": 1.0,
+    "failed": 1.0
+}
+
+
+def train_in_worker(data_path, registry_root=None):
+    """Train a fresh detector in a worker process and persist it with save_model().
+
+    With registry_root, the detector is also registered as a new model
+    version and the result carries its "version".
+    """
+    from model import FakeNewsDetector
+
+    started = time.time()
+    worker_detector = FakeNewsDetector()
+    accuracy = worker_detector.train(data_path)
+    worker_detector.save_model()
+    result = {"mode": "full", "accuracy": accuracy, "train_seconds": time.time() - started}
+    return register_trained(registry_root, worker_detector, result, data_path)
+
+
+def train_streaming_in_worker(data_path, chunksize, registry_root=None):
+    """Out-of-core counterpart of train_in_worker for corpora larger than RAM"""
+    started = time.time()
+    worker_detector = StreamingFakeNewsDetector(chunksize=chunksize)
+    accuracy = worker_detector.train(data_path)
+    worker_detector.save_model()
+    result = {"mode": "streaming", "accuracy": accuracy, "train_seconds": time.time() - started}
+    return register_trained(registry_root, worker_detector, result, data_path, {"chunksize": chunksize})
+
+
+class TrainingJobs:
+    """Runs training jobs one at a time in a separate process.
+
+    on_complete(result) is called in the serving process once the worker has
+    saved the new model; it is responsible for loading and swapping it in.
+
+    Job state lives in a SQLite file (next to the model registry in app.py),
+    so any serve.py worker can report a job another worker accepted, and a
+    file lock next to it makes jobs from all workers train one at a time.
+
+    The queue thread and the training process are created on the first
+    submit() and again in a forked child: serve.py imports the app before
+    forking, and a pool inherited across fork() shares its call and result
+    pipes with every other worker.
+    """
+
+    def __init__(self, on_complete, path='models/jobs.sqlite', max_history=100):
+        self.on_complete = on_complete
+        self.path = path
+        self.lock_path = path + '.lock'
+        self.max_history = max_history
+        self._start_lock = threading.Lock()
+        # One job runs at a time; the thread waits on the process so the
+        # serving threads never do training work themselves
+        self._queue = None
+        self._pool = None
+        self._pid = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _connect(self):
+        # A short-lived connection per call, so none is ever carried across fork()
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, submitted_at REAL NOT NULL, "
+                     "job TEXT NOT NULL)")
+        return closing(conn)
+
+    def _ensure_queue(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # Inherited executors (if any) belong to the parent; never touch them
+            self._queue = ThreadPoolExecutor(max_workers=1)
+            self._pool = None
+            self._pid = os.getpid()
+
+    def submit(self, train_fn, *args, **kwargs):
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "progress": STAGES["queued"],
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "duration_seconds": None,
+            "result": None,
+            "error": None
+        }
+        with self._connect() as conn, conn:
+            conn.execute("INSERT INTO jobs (job_id, submitted_at, job) VALUES (?, ?, ?)",
+                         (job_id, job["submitted_at"], json.dumps(job)))
+            conn.execute("DELETE FROM jobs WHERE job_id NOT IN "
+                         "(SELECT job_id FROM jobs ORDER BY submitted_at DESC LIMIT ?)", (self.max_history,))
+        self._ensure_queue()
+        self._queue.submit(self._run, job_id, train_fn, args, kwargs)
+        return self.get(job_id)
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT job FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def _update(self, job_id, **fields):
+        # Only the process that accepted a job updates it
+        with self._connect() as conn, conn:
+            row = conn.execute("SELECT job FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            job = json.loads(row[0])
+            job.update(fields)
+            if "status" in fields:
+                job["progress"] = STAGES[fields["status"]]
+            conn.execute("UPDATE jobs SET job = ? WHERE job_id = ?", (json.dumps(job), job_id))
+
+    @contextmanager
+    def _training_slot(self):
+        """Exclusive across processes; without fcntl there is only one process to serialize"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _run(self, job_id, train_fn, args, kwargs):
+        with self._training_slot():
+            self._train(job_id, train_fn, args, kwargs)
+
+    def _train(self, job_id, train_fn, args, kwargs):
+        started = time.time()
+        self._update(job_id, status="training", started_at=started)
+        try:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=1)
+            try:
+                result = self._pool.submit(train_fn, *args, **kwargs).result()
+            except BrokenProcessPool:
+                # The training process died (e.g. OOM-killed); the pool cannot
+                # be reused, so later jobs get a fresh one
+                self._pool.shutdown(wait=False)
+                self._pool = None
+                raise
+            self._update(job_id, status="loading")
+            self.on_complete(result)
+        except Exception as e:
+            status, error, result = "failed", str(e), None
+        else:
+            status, error = "completed", None
+        finished = time.time()
+        self._update(job_id, status=status, error=error, result=result,
+                     finished_at=finished, duration_seconds=finished - started)